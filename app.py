@@ -1,16 +1,44 @@
 """Streamlit app entrypoint for DR Margin Tool."""
 
+from io import BytesIO
+from typing import Any
+
+import pandas as pd
 import streamlit as st
 
-from core.io import MissingColumnsError, load_sales_excel
+from core.io import (
+    REQUIRED_COLUMNS,
+    MissingColumnsError,
+    clean_sales_data,
+    load_sales_excel,
+    parse_numeric_columns,
+    read_sales_excel,
+    validate_sales_data,
+)
 from core.metrics import (
+    HIERARCHY_LEVELS,
     add_margin_columns,
+    add_opportunity,
     clienti_brand_opportunities,
+    compare_periods,
     flotte_brand_opportunities,
+    hierarchy_children,
+    hierarchy_rollups,
     low_margin_articles,
+    pareto_abc,
     segment_article_drilldown,
     segment_kpis,
+    top_customers,
 )
+from core.profiling import enable_json_log, recording, stage
+from core.reports import write_margin_report
+
+
+def render_dataframe(table: Any, **kwargs: Any) -> None:
+    """Show *table* (DataFrame or Styler), timing the Styler rendering."""
+    frame = table if isinstance(table, pd.DataFrame) else table.data
+    with stage("st.dataframe", rows_in=len(frame)):
+        st.dataframe(table, **kwargs)
 
 
 st.set_page_config(page_title="DR Margin Tool", layout="wide")
@@ -32,73 +60,143 @@ target_clienti_pct = st.sidebar.number_input(
     step=1.0,
 ) / 100
 
+debug_enabled = st.sidebar.checkbox(
+    "Pannello debug prestazioni",
+    value=False,
+    help="Misura tempo e righe di ogni fase di elaborazione e le scrive anche nel log.",
+)
+memory_enabled = debug_enabled and st.sidebar.checkbox(
+    "Misura memoria",
+    value=False,
+    help="Aggiunge il picco di memoria per fase (tracemalloc): i tempi risultano molto più lenti.",
+)
+if debug_enabled:
+    enable_json_log()
+
 uploaded_file = st.file_uploader(
     "Carica file Excel vendite (.xlsx)",
     type=["xlsx"],
     help="L'app supporta solo esportazioni in formato .xlsx.",
 )
 
-if uploaded_file is not None:
-    try:
-        data = load_sales_excel(uploaded_file)
-        data = add_margin_columns(data)
-        kpi_df = segment_kpis(data)
+with recording(enabled=debug_enabled, track_memory=memory_enabled) as recorder:
+    if uploaded_file is not None:
+        try:
+            raw_data = read_sales_excel(uploaded_file)
+            parsed_columns = parse_numeric_columns(raw_data)
+            issues_df = validate_sales_data(raw_data, parsed=parsed_columns)
+            data = clean_sales_data(raw_data, parsed=parsed_columns)
+            data = add_margin_columns(data)
 
-        st.subheader("KPI per segmento")
-        flotte_col, non_flotte_col, totale_col = st.columns(3)
+            if not issues_df.empty:
+                rejected_rows = issues_df.loc[issues_df["gravita"] == "scartata", "riga"].nunique()
+                suspicious_rows = issues_df.loc[issues_df["gravita"] == "sospetta", "riga"].nunique()
+                st.warning(
+                    f"Controllo dati: {rejected_rows} righe non utilizzabili, "
+                    f"{suspicious_rows} righe sospette."
+                )
+                with st.expander("Dettaglio controllo qualità dati"):
+                    render_dataframe(
+                        issues_df.groupby(["codice", "gravita"], observed=True)
+                        .size()
+                        .rename("righe")
+                        .reset_index(),
+                        use_container_width=True,
+                    )
+                    issue_rows = issues_df.head(500).join(
+                        raw_data[REQUIRED_COLUMNS], on="riga"
+                    )
+                    render_dataframe(issue_rows, use_container_width=True)
+            kpi_df = segment_kpis(data)
 
-        segment_layout = [
-            ("flotte", "Flotte", flotte_col),
-            ("non_flotte", "Non Flotte", non_flotte_col),
-            ("totale", "Totale", totale_col),
-        ]
+            st.subheader("KPI per segmento")
+            flotte_col, non_flotte_col, totale_col = st.columns(3)
 
-        for segment_key, segment_label, segment_col in segment_layout:
-            values = kpi_df.loc[segment_key]
-            with segment_col:
-                st.markdown(f"**{segment_label}**")
-                st.metric("Fatturato", f"€ {values['fatturato_totale']:,.2f}")
-                st.metric("Margine €", f"€ {values['margine_totale']:,.2f}")
-                margin_pct = values["margine_medio_pct"]
-                margin_pct_text = "n/d" if margin_pct != margin_pct else f"{margin_pct:.2%}"
-                st.metric("Margine %", margin_pct_text)
-
-        st.subheader("Margine migliorabile € per marca")
-        flotte_tab, clienti_tab, sotto_soglia_tab = st.tabs(["Flotte", "Clienti", "Sotto soglia"])
-
-        with flotte_tab:
-            flotte_brand_df = flotte_brand_opportunities(data, target_flotte_pct)
-            st.dataframe(
-                flotte_brand_df.style.format(
-                    {
-                        "fatturato": "€ {:,.2f}",
-                        "margine_euro": "€ {:,.2f}",
-                        "margine_pct": "{:.2%}",
-                        "target_pct": "{:.2%}",
-                        "migliorabile_euro": "€ {:,.2f}",
-                    }
-                ),
-                use_container_width=True,
+            segment_layout = [
+                ("flotte", "Flotte", flotte_col),
+                ("non_flotte", "Non Flotte", non_flotte_col),
+                ("totale", "Totale", totale_col),
+            ]
+
+            for segment_key, segment_label, segment_col in segment_layout:
+                values = kpi_df.loc[segment_key]
+                with segment_col:
+                    st.markdown(f"**{segment_label}**")
+                    st.metric("Fatturato", f"€ {values['fatturato_totale']:,.2f}")
+                    st.metric("Margine €", f"€ {values['margine_totale']:,.2f}")
+                    margin_pct = values["margine_medio_pct"]
+                    margin_pct_text = "n/d" if margin_pct != margin_pct else f"{margin_pct:.2%}"
+                    st.metric("Margine %", margin_pct_text)
+
+            st.subheader("Margine migliorabile € per marca")
+            (
+                flotte_tab,
+                clienti_tab,
+                sotto_soglia_tab,
+                confronto_tab,
+                top_clienti_tab,
+                concentrazione_tab,
+                gerarchia_tab,
+            ) = st.tabs(
+                [
+                    "Flotte",
+                    "Clienti",
+                    "Sotto soglia",
+                    "Confronto periodi",
+                    "Clienti principali",
+                    "Concentrazione ABC",
+                    "Gerarchia clienti",
+                ]
             )
 
-            flotte_brands = flotte_brand_df["marca"].dropna().unique().tolist()
-            if flotte_brands:
-                selected_flotte_brand = st.selectbox("Marca (Flotte)", flotte_brands)
-                flotte_drilldown_df = segment_article_drilldown(
-                    data,
-                    segment="flotte",
-                    selected_brand=selected_flotte_brand,
-                    target_pct=target_flotte_pct,
+            with flotte_tab:
+                flotte_brand_df = flotte_brand_opportunities(data, target_flotte_pct)
+                render_dataframe(
+                    flotte_brand_df.style.format(
+                        {
+                            "fatturato": "€ {:,.2f}",
+                            "margine_euro": "€ {:,.2f}",
+                            "margine_pct": "{:.2%}",
+                            "target_pct": "{:.2%}",
+                            "migliorabile_euro": "€ {:,.2f}",
+                        }
+                    ),
+                    use_container_width=True,
                 )
-                st.dataframe(
-                    flotte_drilldown_df.style.format(
+
+                flotte_brands = flotte_brand_df["marca"].dropna().unique().tolist()
+                if flotte_brands:
+                    selected_flotte_brand = st.selectbox("Marca (Flotte)", flotte_brands)
+                    flotte_drilldown_df = segment_article_drilldown(
+                        data,
+                        segment="flotte",
+                        selected_brand=selected_flotte_brand,
+                        target_pct=target_flotte_pct,
+                    )
+                    render_dataframe(
+                        flotte_drilldown_df.style.format(
+                            {
+                                "quantità": "{:,.2f}",
+                                "fatturato": "€ {:,.2f}",
+                                "margine_euro": "€ {:,.2f}",
+                                "margine_pct": "{:.2%}",
+                                "prezzo_vendita_medio": "€ {:,.2f}",
+                                "costo_medio": "€ {:,.2f}",
+                                "target_pct": "{:.2%}",
+                                "migliorabile_euro": "€ {:,.2f}",
+                            }
+                        ),
+                        use_container_width=True,
+                    )
+
+            with clienti_tab:
+                clienti_brand_df = clienti_brand_opportunities(data, target_clienti_pct)
+                render_dataframe(
+                    clienti_brand_df.style.format(
                         {
-                            "quantità": "{:,.2f}",
                             "fatturato": "€ {:,.2f}",
                             "margine_euro": "€ {:,.2f}",
                             "margine_pct": "{:.2%}",
-                            "prezzo_vendita_medio": "€ {:,.2f}",
-                            "costo_medio": "€ {:,.2f}",
                             "target_pct": "{:.2%}",
                             "migliorabile_euro": "€ {:,.2f}",
                         }
@@ -106,32 +204,47 @@ if uploaded_file is not None:
                     use_container_width=True,
                 )
 
-        with clienti_tab:
-            clienti_brand_df = clienti_brand_opportunities(data, target_clienti_pct)
-            st.dataframe(
-                clienti_brand_df.style.format(
-                    {
-                        "fatturato": "€ {:,.2f}",
-                        "margine_euro": "€ {:,.2f}",
-                        "margine_pct": "{:.2%}",
-                        "target_pct": "{:.2%}",
-                        "migliorabile_euro": "€ {:,.2f}",
-                    }
-                ),
-                use_container_width=True,
-            )
+                clienti_brands = clienti_brand_df["marca"].dropna().unique().tolist()
+                if clienti_brands:
+                    selected_clienti_brand = st.selectbox("Marca (Clienti)", clienti_brands)
+                    clienti_drilldown_df = segment_article_drilldown(
+                        data,
+                        segment="clienti",
+                        selected_brand=selected_clienti_brand,
+                        target_pct=target_clienti_pct,
+                    )
+                    render_dataframe(
+                        clienti_drilldown_df.style.format(
+                            {
+                                "quantità": "{:,.2f}",
+                                "fatturato": "€ {:,.2f}",
+                                "margine_euro": "€ {:,.2f}",
+                                "margine_pct": "{:.2%}",
+                                "prezzo_vendita_medio": "€ {:,.2f}",
+                                "costo_medio": "€ {:,.2f}",
+                                "target_pct": "{:.2%}",
+                                "migliorabile_euro": "€ {:,.2f}",
+                            }
+                        ),
+                        use_container_width=True,
+                    )
 
-            clienti_brands = clienti_brand_df["marca"].dropna().unique().tolist()
-            if clienti_brands:
-                selected_clienti_brand = st.selectbox("Marca (Clienti)", clienti_brands)
-                clienti_drilldown_df = segment_article_drilldown(
+            with sotto_soglia_tab:
+                segment_choice = st.selectbox("Segmento", ["tutti", "flotte", "clienti"])
+                threshold_pct = (
+                    st.number_input("Soglia margine %", min_value=0.0, max_value=100.0, value=10.0, step=1.0)
+                    / 100
+                )
+                min_fatturato = st.number_input("Fatturato minimo", min_value=0.0, value=0.0, step=100.0)
+
+                low_margin_df = low_margin_articles(
                     data,
-                    segment="clienti",
-                    selected_brand=selected_clienti_brand,
-                    target_pct=target_clienti_pct,
+                    segment=segment_choice,
+                    threshold_pct=threshold_pct,
+                    min_fatturato=min_fatturato,
                 )
-                st.dataframe(
-                    clienti_drilldown_df.style.format(
+                render_dataframe(
+                    low_margin_df.style.format(
                         {
                             "quantità": "{:,.2f}",
                             "fatturato": "€ {:,.2f}",
@@ -139,60 +252,295 @@ if uploaded_file is not None:
                             "margine_pct": "{:.2%}",
                             "prezzo_vendita_medio": "€ {:,.2f}",
                             "costo_medio": "€ {:,.2f}",
-                            "target_pct": "{:.2%}",
-                            "migliorabile_euro": "€ {:,.2f}",
                         }
                     ),
                     use_container_width=True,
                 )
 
-        with sotto_soglia_tab:
-            segment_choice = st.selectbox("Segmento", ["tutti", "flotte", "clienti"])
-            threshold_pct = (
-                st.number_input("Soglia margine %", min_value=0.0, max_value=100.0, value=10.0, step=1.0)
-                / 100
-            )
-            min_fatturato = st.number_input("Fatturato minimo", min_value=0.0, value=0.0, step=100.0)
+            with confronto_tab:
+                previous_file = st.file_uploader(
+                    "Carica file Excel del periodo precedente (.xlsx)",
+                    type=["xlsx"],
+                    key="previous_file",
+                )
+                previous_data = None
+                if previous_file is not None:
+                    try:
+                        previous_data = add_margin_columns(load_sales_excel(previous_file))
+                    except MissingColumnsError as exc:
+                        st.error(
+                            "Il file del periodo precedente non contiene le colonne richieste. "
+                            f"Dettaglio: {exc}"
+                        )
+                    except ValueError as exc:
+                        st.error(str(exc))
+                    except Exception:
+                        st.error(
+                            "Si è verificato un errore durante la lettura del file del periodo "
+                            "precedente. Verifica che sia un file .xlsx valido e riprova."
+                        )
 
-            low_margin_df = low_margin_articles(
-                data,
-                segment=segment_choice,
-                threshold_pct=threshold_pct,
-                min_fatturato=min_fatturato,
-            )
-            st.dataframe(
-                low_margin_df.style.format(
-                    {
+                if previous_data is not None:
+                    compare_segment = st.selectbox(
+                        "Segmento", ["tutti", "flotte", "clienti"], key="compare_segment"
+                    )
+                    compare_level = st.radio(
+                        "Livello", ["marca", "articolo"], horizontal=True, key="compare_level"
+                    )
+                    compare_top_n = st.number_input(
+                        "Numero righe", min_value=1, value=50, step=10, key="compare_top_n"
+                    )
+                    if compare_segment == "flotte":
+                        compare_target_pct = target_flotte_pct
+                        compare_target_label = "Flotte"
+                    else:
+                        compare_target_pct = target_clienti_pct
+                        compare_target_label = "Clienti"
+                    st.caption(
+                        f"Margine migliorabile calcolato con il target {compare_target_label} "
+                        f"({compare_target_pct:.0%})"
+                        + (" anche per le flotte." if compare_segment == "tutti" else ".")
+                    )
+
+                    comparison_df = compare_periods(
+                        previous_data,
+                        data,
+                        target_pct=compare_target_pct,
+                        segment=compare_segment,
+                        level=compare_level,
+                        top_n=int(compare_top_n),
+                    )
+                    comparison_format = {
+                        col: "{:.2%}" if "margine_pct" in col else "€ {:,.2f}"
+                        for col in comparison_df.columns
+                        if col not in ("marca", "articolo")
+                    }
+                    render_dataframe(
+                        comparison_df.style.format(comparison_format, na_rep="n/d"),
+                        use_container_width=True,
+                    )
+
+            with top_clienti_tab:
+                if "codice cliente" not in data.columns:
+                    st.info("Il file caricato non contiene la colonna del codice cliente (CFR).")
+                else:
+                    top_k = st.number_input("Numero clienti", min_value=1, value=10, step=5, key="top_k")
+                    top_by_label = st.radio(
+                        "Ordina per",
+                        ["Fatturato", "Margine migliorabile €"],
+                        horizontal=True,
+                        key="top_by",
+                    )
+                    top_by = "fatturato" if top_by_label == "Fatturato" else "migliorabile_euro"
+
+                    for top_segment, top_label, top_target_pct in (
+                        ("flotte", "Flotte", target_flotte_pct),
+                        ("clienti", "Clienti", target_clienti_pct),
+                    ):
+                        st.markdown(f"**{top_label}**")
+                        top_df = top_customers(
+                            data,
+                            segment=top_segment,
+                            target_pct=top_target_pct,
+                            k=int(top_k),
+                            by=top_by,
+                        )
+                        if top_df.empty:
+                            st.info("Nessun cliente per il segmento selezionato.")
+                            continue
+                        render_dataframe(
+                            top_df.style.format(
+                                {
+                                    "fatturato": "€ {:,.2f}",
+                                    "margine_euro": "€ {:,.2f}",
+                                    "margine_pct": "{:.2%}",
+                                    "target_pct": "{:.2%}",
+                                    "migliorabile_euro": "€ {:,.2f}",
+                                }
+                            ),
+                            use_container_width=True,
+                        )
+
+            with concentrazione_tab:
+                abc_segment = st.selectbox("Segmento", ["flotte", "clienti"], key="abc_segment")
+                abc_level = st.radio(
+                    "Livello", ["marca", "articolo"], horizontal=True, key="abc_level"
+                )
+                abc_metric_label = st.radio(
+                    "Metrica",
+                    ["Margine migliorabile €", "Fatturato"],
+                    horizontal=True,
+                    key="abc_metric",
+                )
+                abc_metric = "fatturato" if abc_metric_label == "Fatturato" else "migliorabile_euro"
+                abc_target_pct = target_flotte_pct if abc_segment == "flotte" else target_clienti_pct
+
+                abc_df = pareto_abc(
+                    data,
+                    segment=abc_segment,
+                    target_pct=abc_target_pct,
+                    level=abc_level,
+                    metric=abc_metric,
+                )
+                if abc_df.empty:
+                    st.info("Nessun dato per il segmento selezionato.")
+                else:
+                    class_summary = abc_df.groupby("classe").agg(
+                        elementi=("rank", "size"),
+                        quota=("quota", "sum"),
+                    )
+                    class_columns = st.columns(len(class_summary))
+                    for class_col, (class_name, class_values) in zip(
+                        class_columns, class_summary.iterrows()
+                    ):
+                        class_col.metric(
+                            f"Classe {class_name}",
+                            f"{int(class_values['elementi']):,} {abc_level}",
+                            f"{class_values['quota']:.1%} del totale",
+                            delta_color="off",
+                        )
+
+                    curve_step = max(1, len(abc_df) // 500)
+                    curve_df = abc_df.iloc[list(range(0, len(abc_df), curve_step)) + [len(abc_df) - 1]]
+                    st.line_chart(
+                        curve_df.drop_duplicates("rank").set_index("quota_elementi")["quota_cumulata"],
+                        x_label="Quota elementi",
+                        y_label="Quota cumulata",
+                    )
+                    # column_config instead of a Styler: article-level tables can
+                    # exceed pandas' styler.render.max_elements.
+                    euro_column = st.column_config.NumberColumn(format="euro")
+                    percent_column = st.column_config.NumberColumn(format="percent")
+                    render_dataframe(
+                        abc_df,
+                        column_config={
+                            "fatturato": euro_column,
+                            "margine_euro": euro_column,
+                            "margine_pct": percent_column,
+                            "target_pct": percent_column,
+                            "migliorabile_euro": euro_column,
+                            "quota": percent_column,
+                            "quota_cumulata": percent_column,
+                            "quota_elementi": percent_column,
+                        },
+                        use_container_width=True,
+                    )
+
+            with gerarchia_tab:
+                if "sottocategoria cliente" not in data.columns:
+                    st.info(
+                        "Il file caricato non contiene la colonna della sottocategoria cliente (CS)."
+                    )
+                else:
+                    rollup_key = getattr(uploaded_file, "file_id", uploaded_file.name)
+                    cached_rollups = st.session_state.get("hierarchy_rollups")
+                    if cached_rollups is None or cached_rollups[0] != rollup_key:
+                        cached_rollups = (rollup_key, hierarchy_rollups(data))
+                        st.session_state["hierarchy_rollups"] = cached_rollups
+                    rollups = cached_rollups[1]
+
+                    hierarchy_format = {
                         "quantità": "{:,.2f}",
                         "fatturato": "€ {:,.2f}",
                         "margine_euro": "€ {:,.2f}",
                         "margine_pct": "{:.2%}",
-                        "prezzo_vendita_medio": "€ {:,.2f}",
-                        "costo_medio": "€ {:,.2f}",
+                        "target_pct": "{:.2%}",
+                        "migliorabile_euro": "€ {:,.2f}",
                     }
-                ),
-                use_container_width=True,
+                    categorie_df = hierarchy_children(rollups).reset_index()
+                    categorie_target = pd.to_numeric(
+                        categorie_df["categoria cliente"], errors="coerce"
+                    ).eq(46)
+                    categorie_df = add_opportunity(
+                        categorie_df,
+                        categorie_target.map({True: target_flotte_pct, False: target_clienti_pct}),
+                    )
+                    render_dataframe(
+                        categorie_df.style.format(hierarchy_format, na_rep="n/d"),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+
+                    hierarchy_path: tuple = ()
+                    for level_name, level_column in list(HIERARCHY_LEVELS.items())[:-1]:
+                        options = hierarchy_children(rollups, hierarchy_path).index.tolist()
+                        if not options:
+                            break
+                        selected_key = st.selectbox(
+                            level_column.capitalize(),
+                            options,
+                            format_func=lambda key: "n/d" if pd.isna(key) else str(key),
+                            key=f"hierarchy_{level_name}",
+                        )
+                        hierarchy_path = hierarchy_path + (selected_key,)
+                        node_target_pct = (
+                            target_flotte_pct
+                            if pd.to_numeric(hierarchy_path[0], errors="coerce") == 46
+                            else target_clienti_pct
+                        )
+                        children_df = add_opportunity(
+                            hierarchy_children(rollups, hierarchy_path).reset_index(),
+                            node_target_pct,
+                        ).sort_values("migliorabile_euro", ascending=False)
+                        render_dataframe(
+                            children_df.style.format(hierarchy_format, na_rep="n/d"),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+
+            st.subheader("Report Excel")
+            if st.button("Genera report Excel"):
+                report_buffer = BytesIO()
+                write_margin_report(
+                    data,
+                    report_buffer,
+                    target_flotte_pct=target_flotte_pct,
+                    target_clienti_pct=target_clienti_pct,
+                    threshold_pct=threshold_pct,
+                    min_fatturato=min_fatturato,
+                    segment=segment_choice,
+                )
+                st.download_button(
+                    "Scarica report",
+                    data=report_buffer.getvalue(),
+                    file_name="report_margini.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+
+            st.subheader("Anteprima dati (prime 20 righe)")
+            preview_columns = [
+                "categoria cliente",
+                "MARCA / ARTICOLO",
+                "quantità",
+                "ultimo prezzo acquisto",
+                "prezzo vendita",
+                "fatturato_riga",
+                "margine_euro",
+                "margine_pct",
+            ]
+            available_columns = [col for col in preview_columns if col in data.columns]
+            render_dataframe(data[available_columns].head(20), use_container_width=True)
+        except MissingColumnsError as exc:
+            st.error(f"Il file caricato non contiene le colonne richieste. Dettaglio: {exc}")
+        except ValueError as exc:
+            st.error(str(exc))
+        except Exception:
+            st.error(
+                "Si è verificato un errore durante la lettura del file. "
+                "Verifica che sia un file .xlsx valido e riprova."
             )
 
-        st.subheader("Anteprima dati (prime 20 righe)")
-        preview_columns = [
-            "categoria cliente",
-            "MARCA / ARTICOLO",
-            "quantità",
-            "ultimo prezzo acquisto",
-            "prezzo vendita",
-            "fatturato_riga",
-            "margine_euro",
-            "margine_pct",
+if recorder is not None and recorder.records:
+    with st.sidebar.expander("Debug prestazioni", expanded=True):
+        stages_df = recorder.to_frame()
+        stages_df["name"] = [
+            "· " * depth + name for depth, name in zip(stages_df["depth"], stages_df["name"])
         ]
-        available_columns = [col for col in preview_columns if col in data.columns]
-        st.dataframe(data[available_columns].head(20), use_container_width=True)
-    except MissingColumnsError as exc:
-        st.error(f"Il file caricato non contiene le colonne richieste. Dettaglio: {exc}")
-    except ValueError as exc:
-        st.error(str(exc))
-    except Exception:
-        st.error(
-            "Si è verificato un errore durante la lettura del file. "
-            "Verifica che sia un file .xlsx valido e riprova."
+        st.dataframe(
+            stages_df.drop(columns=["depth"]).style.format(
+                {"seconds": "{:.4f}", "peak_mb": "{:.1f}"},
+                na_rep="",
+            ),
+            use_container_width=True,
+            hide_index=True,
         )
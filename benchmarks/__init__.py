@@ -0,0 +1 @@
+"""Benchmarks for DR Margin Tool core functions."""
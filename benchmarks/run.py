@@ -0,0 +1,270 @@
+"""Time and memory benchmarks for core.io and core.metrics.
+
+Usage::
+
+    python -m benchmarks.run                      # compare with baseline.json
+    python -m benchmarks.run --sizes 10000 100000
+    python -m benchmarks.run --update-baseline    # record a new baseline
+
+Every public function is run on seeded synthetic exports (see
+``benchmarks.synthetic``) from in-memory, CSV and, up to ``--xlsx-max-rows``,
+xlsx inputs; ``uncovered_functions`` lists public functions of ``core.io``
+and ``core.metrics`` that have no case yet (the test suite requires none).
+Wall time is the best of ``--repeat`` runs (7 by default, the count the
+committed baseline was recorded with); peak memory is measured with
+tracemalloc in a separate run so it does not inflate timings.
+The process exits with status 1 when a result exceeds the stored baseline by
+more than ``--tolerance`` (relative) and ``--min-delta-seconds`` /
+``--min-delta-mb`` (absolute). Baselines are machine-specific: record them on
+the machine that runs the comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import inspect
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+import core.io
+import core.metrics
+from benchmarks.synthetic import (
+    XLSX_MAX_ROWS,
+    generate_sales_export,
+    read_csv_export,
+    to_canonical,
+    write_csv,
+    write_xlsx,
+)
+from core.io import (
+    clean_sales_data,
+    load_sales_excel,
+    parse_numeric_columns,
+    read_sales_excel,
+    to_float_it,
+    to_float_it_series,
+    validate_sales_data,
+)
+from core.metrics import (
+    add_margin_columns,
+    add_opportunity,
+    article_summary,
+    brand_summary,
+    clienti_brand_opportunities,
+    compare_periods,
+    flotte_brand_opportunities,
+    hierarchy_children,
+    hierarchy_rollups,
+    low_margin_articles,
+    non_flotte_brand_opportunities,
+    pareto_abc,
+    segment_article_drilldown,
+    segment_article_opportunities,
+    segment_kpis,
+    top_customers,
+)
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+BENCHMARKED_MODULES = (core.io, core.metrics)
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+TARGET_PCT = 0.45
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_mb": peak / 2**20}
+
+
+def _cases(n_rows: int, workdir: Path, xlsx_max_rows: int) -> dict[str, Callable[[], Any]]:
+    """Build the benchmark closures for one input size."""
+    export = generate_sales_export(n_rows, seed=n_rows)
+    raw = to_canonical(export)
+    cleaned = clean_sales_data(raw)
+    data = add_margin_columns(cleaned)
+    previous_export = generate_sales_export(n_rows, seed=n_rows + 1)
+    previous = add_margin_columns(clean_sales_data(to_canonical(previous_export)))
+    top_brand = data["marca"].value_counts().index[0]
+    brands = brand_summary(data)
+    rollups = hierarchy_rollups(data)
+    top_subcategory = rollups["sottocategoria"]["fatturato"].idxmax()
+
+    csv_path = workdir / f"vendite_{n_rows}.csv"
+    write_csv(export, csv_path)
+
+    cases: dict[str, Callable[[], Any]] = {
+        "to_float_it": lambda: raw["prezzo vendita"].map(to_float_it),
+        "to_float_it_series": lambda: to_float_it_series(raw["prezzo vendita"]),
+        "parse_numeric_columns": lambda: parse_numeric_columns(raw),
+        "clean_sales_data": lambda: clean_sales_data(raw),
+        "validate_sales_data": lambda: validate_sales_data(raw),
+        "csv:read+clean_sales_data": lambda: clean_sales_data(read_csv_export(csv_path)),
+        "add_margin_columns": lambda: add_margin_columns(cleaned),
+        "segment_kpis": lambda: segment_kpis(data),
+        "brand_summary": lambda: brand_summary(data),
+        "add_opportunity": lambda: add_opportunity(brands, TARGET_PCT),
+        "flotte_brand_opportunities": lambda: flotte_brand_opportunities(data, TARGET_PCT),
+        "non_flotte_brand_opportunities": lambda: non_flotte_brand_opportunities(data, TARGET_PCT),
+        "clienti_brand_opportunities": lambda: clienti_brand_opportunities(data, TARGET_PCT),
+        "article_summary": lambda: article_summary(data),
+        "segment_article_drilldown": lambda: segment_article_drilldown(data, "tutti", top_brand, TARGET_PCT),
+        "segment_article_opportunities": lambda: segment_article_opportunities(data, "tutti", TARGET_PCT),
+        "low_margin_articles": lambda: low_margin_articles(data, "tutti", 0.10),
+        "compare_periods": lambda: compare_periods(previous, data, TARGET_PCT),
+        "top_customers": lambda: top_customers(data, "clienti", TARGET_PCT, by="migliorabile_euro"),
+        "pareto_abc": lambda: pareto_abc(data, "clienti", TARGET_PCT, level="articolo"),
+        "hierarchy_rollups": lambda: hierarchy_rollups(data),
+        "hierarchy_children": lambda: hierarchy_children(rollups, top_subcategory),
+    }
+
+    if n_rows <= min(xlsx_max_rows, XLSX_MAX_ROWS):
+        xlsx_path = workdir / f"vendite_{n_rows}.xlsx"
+        write_xlsx(export, xlsx_path)
+        cases["xlsx:read_sales_excel"] = lambda: read_sales_excel(xlsx_path)
+        cases["xlsx:load_sales_excel"] = lambda: load_sales_excel(xlsx_path)
+
+    return cases
+
+
+def public_functions(module: ModuleType) -> list[str]:
+    """Return the public functions defined in *module* (``__all__`` if set)."""
+    names = getattr(module, "__all__", None) or [
+        name for name in vars(module) if not name.startswith("_")
+    ]
+    return [
+        name
+        for name in names
+        if inspect.isfunction(getattr(module, name))
+        and getattr(module, name).__module__ == module.__name__
+    ]
+
+
+def uncovered_functions(case_names: Iterable[str]) -> list[str]:
+    """Return ``module.function`` for every public function without a case.
+
+    A case covers a function when its name, minus an optional ``xlsx:`` /
+    ``csv:`` style prefix, is the function name.
+    """
+    covered = {name.rsplit(":", 1)[-1] for name in case_names}
+    return [
+        f"{module.__name__}.{name}"
+        for module in BENCHMARKED_MODULES
+        for name in public_functions(module)
+        if name not in covered
+    ]
+
+
+def run_benchmarks(
+    sizes: list[int],
+    repeat: int = 7,
+    xlsx_max_rows: int = 100_000,
+    only: list[str] | None = None,
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Return ``{size: {case: {"seconds": ..., "peak_mb": ...}}}``."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            cases = _cases(n_rows, Path(tmp), xlsx_max_rows)
+            size_results = {}
+            for name, func in cases.items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                size_results[name] = _measure(func, repeat)
+                print(
+                    f"{n_rows:>9,} {name:<32} "
+                    f"{size_results[name]['seconds']:>9.4f} s "
+                    f"{size_results[name]['peak_mb']:>9.1f} MB",
+                    flush=True,
+                )
+            results[str(n_rows)] = size_results
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float = 0.25,
+    min_delta_seconds: float = 0.005,
+    min_delta_mb: float = 1.0,
+) -> list[str]:
+    """Return a human-readable line for every result worse than baseline."""
+    min_deltas = {"seconds": min_delta_seconds, "peak_mb": min_delta_mb}
+    regressions = []
+    for size, cases in results.items():
+        for name, measured in cases.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            for metric, min_delta in min_deltas.items():
+                limit = reference[metric] * (1 + tolerance)
+                if measured[metric] > limit and measured[metric] - reference[metric] > min_delta:
+                    regressions.append(
+                        f"{name} @ {size} rows: {metric} {measured[metric]:.4f} "
+                        f"> baseline {reference[metric]:.4f} (+{tolerance:.0%})"
+                    )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--xlsx-max-rows", type=int, default=100_000)
+    parser.add_argument("--only", nargs="+", help="run only cases whose name contains one of these")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-seconds", type=float, default=0.005)
+    parser.add_argument("--min-delta-mb", type=float, default=1.0)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.xlsx_max_rows, args.only)
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        for size, cases in results.items():
+            baseline.setdefault(size, {}).update(cases)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline aggiornata: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"Nessuna baseline in {args.baseline}: esegui con --update-baseline")
+        return 0
+
+    regressions = find_regressions(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.tolerance,
+        args.min_delta_seconds,
+        args.min_delta_mb,
+    )
+    for line in regressions:
+        print("REGRESSIONE:", line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Per-session rerun cost of app.py, measured with Streamlit's AppTest.
+
+Usage::
+
+    python -m benchmarks.session_benchmark --sessions 8 --workers 2 --rows 20000 --rounds 3
+
+Each simulated session runs the app headlessly, uploads a synthetic export
+(see ``benchmarks.synthetic``) and then repeatedly changes the sidebar
+targets, the Flotte/Clienti brand selectboxes and the low-margin threshold.
+Every interaction is one script rerun; the report lists latency
+percentiles per interaction and the memory one session needs.
+
+AppTest keeps Streamlit's runtime and config in process-wide globals, so
+every session runs in a fresh spawned process (at most *workers* at a
+time) and its memory figures are its own. This is *not* a capacity test of
+one ``streamlit run`` server: sessions do not share a process, a GIL or
+``st.cache_*`` data, so contention between analysts on a single server is
+not measured. Use the figures as the per-session rerun cost and memory
+(RSS growth over the interpreter and imports); they are a lower bound for
+sizing a container and a guard against regressions in rerun cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import generate_sales_export, write_xlsx
+
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app.py"
+
+
+def current_rss_mb() -> float:
+    """Return the resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def build_fixture(n_rows: int, seed: int, directory: Path) -> bytes:
+    """Write a synthetic export workbook and return its bytes."""
+    path = directory / f"vendite_{n_rows}_{seed}.xlsx"
+    write_xlsx(generate_sales_export(n_rows, seed=seed), path)
+    return path.read_bytes()
+
+
+def _widget(elements: Any, label: str) -> Any:
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"Widget non trovato: {label}")
+
+
+def _timed(name: str, action: Callable[[], Any], latencies: dict[str, list[float]]) -> None:
+    start = time.perf_counter()
+    action()
+    latencies[name].append(time.perf_counter() - start)
+
+
+def run_session(
+    content: bytes,
+    rounds: int,
+    seed: int,
+    timeout: float,
+) -> tuple[dict[str, list[float]], list[str]]:
+    """Drive one app session through an upload and *rounds* of edits.
+
+    Returns the latencies per interaction and any error met on the way.
+    Must not run concurrently with another AppTest in the same process.
+    """
+    rng = random.Random(seed)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+
+    def check() -> None:
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if at.error:
+            raise RuntimeError(at.error[0].value)
+
+    try:
+        _timed("avvio", lambda: at.run(), latencies)
+        _timed(
+            "caricamento file",
+            lambda: at.file_uploader[0].upload("vendite.xlsx", content).run(),
+            latencies,
+        )
+        check()
+
+        for _ in range(rounds):
+            for label in ("Target margine % Flotte", "Target margine % Clienti"):
+                number_input = _widget(at.number_input, label)
+                value = float(rng.randint(20, 60))
+                _timed(
+                    "target",
+                    lambda number_input=number_input, value=value: number_input.set_value(value).run(),
+                    latencies,
+                )
+                check()
+
+            for label in ("Marca (Flotte)", "Marca (Clienti)"):
+                selectbox = _widget(at.selectbox, label)
+                brand = rng.choice(list(selectbox.options)[:20])
+                _timed(
+                    "marca",
+                    lambda selectbox=selectbox, brand=brand: selectbox.set_value(brand).run(),
+                    latencies,
+                )
+                check()
+
+            threshold_input = _widget(at.number_input, "Soglia margine %")
+            threshold = float(rng.randint(0, 30))
+            _timed("soglia", lambda: threshold_input.set_value(threshold).run(), latencies)
+            check()
+    except Exception as exc:
+        return dict(latencies), [f"sessione {seed}: {exc}"]
+    return dict(latencies), []
+
+
+def _session_process(
+    content: bytes,
+    rounds: int,
+    seed: int,
+    timeout: float,
+) -> tuple[dict[str, list[float]], list[str], float, float]:
+    """Worker entry point: ``run_session`` plus RSS before and at peak."""
+    rss_base = current_rss_mb()
+    latencies, errors = run_session(content, rounds, seed, timeout)
+    return latencies, errors, rss_base, peak_rss_mb()
+
+
+def latency_report(latencies: dict[str, list[float]]) -> pd.DataFrame:
+    """Summarize latencies (seconds) per interaction with percentiles."""
+    rows = {}
+    for name, values in latencies.items():
+        samples = np.asarray(values)
+        rows[name] = {
+            "n": len(samples),
+            "p50": np.percentile(samples, 50),
+            "p90": np.percentile(samples, 90),
+            "p99": np.percentile(samples, 99),
+            "max": samples.max(),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def run_session_benchmark(
+    sessions: int,
+    n_rows: int,
+    rounds: int = 3,
+    timeout: float = 300.0,
+    workers: int = 1,
+) -> tuple[pd.DataFrame, dict[str, float], list[str]]:
+    """Run *sessions* isolated app sessions, each in a fresh process.
+
+    At most *workers* sessions run at the same time. Returns the latency
+    report, per-session memory figures in MB and any session errors.
+    """
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: list[str] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = build_fixture(n_rows, seed=0, directory=Path(tmp))
+
+    wall_start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, sessions)),
+        mp_context=context,
+        max_tasks_per_child=1,
+    ) as pool:
+        futures = [
+            pool.submit(_session_process, content, rounds, seed, timeout)
+            for seed in range(sessions)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    for session_latencies, session_errors, _, _ in outcomes:
+        for name, values in session_latencies.items():
+            latencies[name].extend(values)
+        errors.extend(session_errors)
+
+    rss_base = np.array([outcome[2] for outcome in outcomes])
+    rss_peak = np.array([outcome[3] for outcome in outcomes])
+    memory = {
+        "rss_base_processo_mb": float(rss_base.mean()),
+        "rss_picco_sessione_mb": float(rss_peak.max()),
+        "rss_per_sessione_medio_mb": float((rss_peak - rss_base).mean()),
+        "rss_per_sessione_max_mb": float((rss_peak - rss_base).max()),
+        "durata_totale_s": time.perf_counter() - wall_start,
+    }
+    return latency_report(latencies), memory, errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=1, help="sessions run at the same time")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    report, memory, errors = run_session_benchmark(
+        args.sessions, args.rows, args.rounds, args.timeout, args.workers
+    )
+
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        print(
+            f"Sessioni isolate: {args.sessions} (un processo nuovo ciascuna, "
+            f"{args.workers} alla volta), righe: {args.rows:,}, giri: {args.rounds}"
+        )
+        print("Costo per sessione: non misura la capacità di un singolo server streamlit.")
+        print(report.to_string())
+    for name, value in memory.items():
+        print(f"{name}: {value:.1f}")
+    for line in errors:
+        print("ERRORE:", line)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Seeded generator of synthetic sales exports for benchmarks.
+
+The generated frames mimic the management system export: abbreviated
+headers, Italian-formatted number strings, Zipf-skewed brand, article and
+customer frequencies, a few dirty cells and, when written to disk, title
+rows above the header.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from core.io import HEADER_ALIASES_CF
+
+
+EXPORT_HEADERS = {
+    "categoria cliente": "CT",
+    "codice cliente": "CFR",
+    "sottocategoria cliente": "CS",
+    "MARCA / ARTICOLO": "MARCA / ARTICOLO",
+    "quantità": "Q.TA'",
+    "ultimo prezzo acquisto": "PRZ. ULT.ACQ.",
+    "prezzo vendita": "PREZZO SC.",
+}
+
+TITLE_ROWS = ["Statistica vendite per articolo", "Periodo: 01/01 - 31/12"]
+
+XLSX_MAX_ROWS = 1_048_575
+
+_CATEGORIES = np.array([46, 10, 12, 20, 31])
+_CATEGORY_WEIGHTS = np.array([0.3, 0.3, 0.2, 0.1, 0.1])
+_SUBCATEGORIES = np.array(["A1", "A2", "B1", "B2", "C1", "C2", "D1"])
+
+
+def _zipf_codes(rng: np.random.Generator, size: int, n_values: int, exponent: float) -> np.ndarray:
+    return (rng.zipf(exponent, size) - 1) % n_values
+
+
+def _format_it(values: np.ndarray, decimals: int = 2) -> pd.Series:
+    """Format floats the way the export does: "1.234,50", "+12,00"."""
+    text = pd.Series(np.char.mod(f"%.{decimals}f", values), dtype=object)
+    text = text.str.replace(".", ",", regex=False)
+    return text.str.replace(r"^(-?\d+)(\d{3}),", r"\1.\2,", regex=True)
+
+
+def generate_sales_export(
+    n_rows: int,
+    seed: int = 0,
+    n_brands: int = 300,
+    n_articles: int = 50_000,
+    n_customers: int = 100_000,
+    dirty_fraction: float = 0.001,
+) -> pd.DataFrame:
+    """Return a raw export with export-style headers and string numbers."""
+    rng = np.random.default_rng(seed)
+    n_articles = max(1, min(n_articles, n_rows))
+
+    brand_weights = 1.0 / np.arange(1, n_brands + 1)
+    article_brand = rng.choice(n_brands, n_articles, p=brand_weights / brand_weights.sum())
+    article_price = rng.lognormal(mean=3.0, sigma=1.2, size=n_articles).round(2)
+    article_margin = rng.normal(0.35, 0.12, n_articles).clip(-0.2, 0.9)
+
+    articles = _zipf_codes(rng, n_rows, n_articles, 1.2)
+    brand_names = np.char.add("MARCA", np.char.zfill(article_brand[articles].astype(str), 3))
+    article_names = np.char.add("ART", np.char.zfill(articles.astype(str), 6))
+    brand_item = np.char.add(np.char.add(brand_names, " / "), article_names)
+
+    sale_price = (article_price[articles] * rng.uniform(0.9, 1.1, n_rows)).round(2)
+    purchase_price = (sale_price * (1 - article_margin[articles])).round(2)
+    quantity = rng.geometric(0.3, n_rows).astype(float)
+
+    customers = _zipf_codes(rng, n_rows, n_customers, 1.3)
+    export = pd.DataFrame(
+        {
+            EXPORT_HEADERS["categoria cliente"]: rng.choice(_CATEGORIES, n_rows, p=_CATEGORY_WEIGHTS),
+            EXPORT_HEADERS["codice cliente"]: np.char.add("C", np.char.zfill(customers.astype(str), 6)),
+            EXPORT_HEADERS["sottocategoria cliente"]: rng.choice(_SUBCATEGORIES, n_rows),
+            EXPORT_HEADERS["MARCA / ARTICOLO"]: brand_item,
+            EXPORT_HEADERS["quantità"]: _format_it(quantity),
+            EXPORT_HEADERS["ultimo prezzo acquisto"]: _format_it(purchase_price, decimals=5),
+            EXPORT_HEADERS["prezzo vendita"]: _format_it(sale_price),
+        }
+    )
+
+    n_dirty = int(n_rows * dirty_fraction)
+    if n_dirty:
+        dirty_rows = rng.choice(n_rows, n_dirty, replace=False)
+        dirty_columns = rng.choice(
+            [EXPORT_HEADERS["quantità"], EXPORT_HEADERS["prezzo vendita"]], n_dirty
+        )
+        dirty_values = rng.choice(["", "n/d", "0,00"], n_dirty)
+        for column in np.unique(dirty_columns):
+            selected = dirty_columns == column
+            export.loc[dirty_rows[selected], column] = dirty_values[selected]
+
+    return export
+
+
+def to_canonical(export: pd.DataFrame) -> pd.DataFrame:
+    """Rename export headers as ``read_sales_excel`` would (in-memory input)."""
+    return export.rename(columns=lambda col: HEADER_ALIASES_CF.get(col.casefold(), col))
+
+
+def write_xlsx(export: pd.DataFrame, path: Any, title_rows: list[str] = TITLE_ROWS) -> None:
+    """Write *export* as xlsx with *title_rows* above the header row."""
+    if len(export) + len(title_rows) + 1 > XLSX_MAX_ROWS + 1:
+        raise ValueError(f"xlsx supports at most {XLSX_MAX_ROWS} data rows")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Vendite")
+    for title in title_rows:
+        sheet.append([title])
+    sheet.append(list(export.columns))
+    for row in export.itertuples(index=False, name=None):
+        sheet.append([value.item() if isinstance(value, np.generic) else value for value in row])
+    workbook.save(path)
+
+
+def write_csv(export: pd.DataFrame, path: Path | str, title_rows: list[str] = TITLE_ROWS) -> None:
+    """Write *export* as semicolon-separated CSV with *title_rows* on top."""
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        for title in title_rows:
+            handle.write(title + "\n")
+        export.to_csv(handle, sep=";", index=False)
+
+
+def read_csv_export(path: Path | str, title_rows: int = len(TITLE_ROWS)) -> pd.DataFrame:
+    """Read a CSV written by ``write_csv`` into canonical raw form."""
+    export = pd.read_csv(path, sep=";", skiprows=title_rows, dtype=str, keep_default_na=False)
+    return to_canonical(export)
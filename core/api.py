@@ -0,0 +1,398 @@
+"""Local HTTP JSON API exposing core.metrics over registered datasets.
+
+Run with ``python -m core.api --port 8502``. Endpoints:
+
+- ``POST /datasets`` with an .xlsx body registers a dataset and returns its
+  content-hash id (``X-Filename`` header is optional). Bodies above
+  ``--max-upload-mb`` get 413; beyond ``--max-datasets`` the least recently
+  used dataset is dropped.
+- ``GET /datasets`` lists registered dataset ids.
+- ``GET /datasets/<id>/<endpoint>?param=value`` returns the endpoint result
+  as JSON records. Responses carry an ``ETag`` and are cached by
+  (dataset, endpoint, parameters).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from core.io import MissingColumnsError, load_sales_excel
+from core.metrics import (
+    add_margin_columns,
+    clienti_brand_opportunities,
+    flotte_brand_opportunities,
+    low_margin_articles,
+    segment_kpis,
+)
+
+
+__all__ = [
+    "ENDPOINTS",
+    "ApiError",
+    "DatasetRegistry",
+    "ResponseCache",
+    "MetricsApiServer",
+    "create_server",
+    "main",
+]
+
+
+class ApiError(Exception):
+    """Raised by request handling code to produce a JSON error response."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _NamedBytesIO(io.BytesIO):
+    def __init__(self, content: bytes, name: str):
+        super().__init__(content)
+        self.name = name
+
+
+class DatasetRegistry:
+    """Thread-safe LRU store of loaded datasets keyed by content hash."""
+
+    def __init__(self, max_datasets: int = 16) -> None:
+        self.max_datasets = max_datasets
+        self._datasets: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, content: bytes, filename: str = "upload.xlsx") -> tuple[str, list[str]]:
+        """Load *content* as a sales workbook.
+
+        Returns the dataset id and the ids evicted to stay within
+        *max_datasets*. Uploading the same bytes twice returns the same id
+        without reloading.
+        """
+        dataset_id = hashlib.sha256(content).hexdigest()[:16]
+        with self._lock:
+            if dataset_id in self._datasets:
+                self._datasets.move_to_end(dataset_id)
+                return dataset_id, []
+
+        data = add_margin_columns(load_sales_excel(_NamedBytesIO(content, filename)))
+        evicted = []
+        with self._lock:
+            self._datasets.setdefault(dataset_id, data)
+            self._datasets.move_to_end(dataset_id)
+            while len(self._datasets) > self.max_datasets:
+                evicted.append(self._datasets.popitem(last=False)[0])
+        return dataset_id, evicted
+
+    def get(self, dataset_id: str) -> pd.DataFrame:
+        with self._lock:
+            data = self._datasets.get(dataset_id)
+            if data is not None:
+                self._datasets.move_to_end(dataset_id)
+        if data is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Dataset non trovato: {dataset_id}")
+        return data
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return list(self._datasets)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialized responses and their ETags."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, body: bytes) -> tuple[str, bytes]:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag, body
+
+    def discard_dataset(self, dataset_id: str) -> None:
+        """Drop every cached response computed from *dataset_id*."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_id]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _float_param(params: dict[str, list[str]], name: str, default: float | None = None) -> float:
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Parametro mancante: {name}")
+        return default
+    try:
+        return float(values[-1])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Parametro non numerico: {name}") from None
+
+
+def _segment_param(params: dict[str, list[str]]) -> str:
+    segment = (params.get("segment") or ["tutti"])[-1]
+    if segment not in ("tutti", "flotte", "clienti"):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "segment must be one of: tutti, flotte, clienti")
+    return segment
+
+
+def _target_params(params: dict[str, list[str]]) -> dict[str, Any]:
+    return {"target_pct": _float_param(params, "target_pct")}
+
+
+def _low_margin_params(params: dict[str, list[str]]) -> dict[str, Any]:
+    return {
+        "segment": _segment_param(params),
+        "threshold_pct": _float_param(params, "threshold_pct"),
+        "min_fatturato": _float_param(params, "min_fatturato", default=0.0),
+    }
+
+
+def _segment_kpis_records(df: pd.DataFrame) -> pd.DataFrame:
+    return segment_kpis(df).rename_axis("segmento").reset_index()
+
+
+# endpoint name -> (metrics function, parser turning query params into kwargs)
+ENDPOINTS: dict[str, tuple[Callable[..., pd.DataFrame], Callable[[dict], dict[str, Any]]]] = {
+    "segment_kpis": (_segment_kpis_records, lambda params: {}),
+    "flotte_brand_opportunities": (flotte_brand_opportunities, _target_params),
+    "clienti_brand_opportunities": (clienti_brand_opportunities, _target_params),
+    "low_margin_articles": (low_margin_articles, _low_margin_params),
+}
+
+
+def _serialize(frame: pd.DataFrame) -> bytes:
+    return frame.to_json(orient="records", force_ascii=False).encode("utf-8")
+
+
+class MetricsApiServer(HTTPServer):
+    """HTTP server dispatching requests to a bounded worker pool."""
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        max_workers: int = 4,
+        cache_entries: int = 256,
+        max_datasets: int = 16,
+        max_upload_bytes: int = 64 * 2**20,
+    ) -> None:
+        super().__init__(server_address, _MetricsRequestHandler)
+        self.registry = DatasetRegistry(max_datasets)
+        self.cache = ResponseCache(cache_entries)
+        self.max_upload_bytes = max_upload_bytes
+        self._inflight: dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metrics-api")
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self._executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+    def compute(self, dataset_id: str, endpoint: str, params: dict[str, list[str]]) -> tuple[str, bytes]:
+        """Return ``(etag, body)`` for an endpoint call, using the cache."""
+        if endpoint not in ENDPOINTS:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Endpoint sconosciuto: {endpoint}")
+        func, parse_params = ENDPOINTS[endpoint]
+        kwargs = parse_params(params)
+        data = self.registry.get(dataset_id)
+
+        key = (dataset_id, endpoint, tuple(sorted(kwargs.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Concurrent misses on the same key wait for the first computation.
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            result = self.cache.put(key, _serialize(func(data, **kwargs)))
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def register(self, content: bytes, filename: str) -> str:
+        dataset_id, evicted = self.registry.register(content, filename)
+        for evicted_id in evicted:
+            self.cache.discard_dataset(evicted_id)
+        return dataset_id
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    server: MetricsApiServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _send_body(self, status: HTTPStatus, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def _send_not_modified(self, etag: str) -> None:
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _path_parts(self) -> tuple[list[str], dict[str, list[str]]]:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        return parts, parse_qs(url.query)
+
+    def do_GET(self) -> None:  # noqa: N802
+        try:
+            parts, params = self._path_parts()
+            if parts == ["datasets"]:
+                self._send_json(HTTPStatus.OK, {"datasets": self.server.registry.ids()})
+                return
+            if len(parts) != 3 or parts[0] != "datasets":
+                raise ApiError(HTTPStatus.NOT_FOUND, "Percorso non trovato")
+
+            etag, body = self.server.compute(parts[1], parts[2], params)
+            if etag in self.headers.get("If-None-Match", ""):
+                self._send_not_modified(etag)
+            else:
+                self._send_body(HTTPStatus.OK, body, etag=etag)
+        except ApiError as exc:
+            self._send_json(exc.status, {"error": exc.message})
+        except Exception:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Errore interno"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        try:
+            parts, _ = self._path_parts()
+            if parts != ["datasets"]:
+                raise ApiError(HTTPStatus.NOT_FOUND, "Percorso non trovato")
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length non valido") from None
+            if length <= 0:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Corpo della richiesta vuoto")
+            if length > self.server.max_upload_bytes:
+                raise ApiError(
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                    f"File troppo grande: massimo {self.server.max_upload_bytes} byte",
+                )
+            content = self.rfile.read(length)
+            filename = self.headers.get("X-Filename", "upload.xlsx")
+
+            try:
+                dataset_id = self.server.register(content, filename)
+            except (MissingColumnsError, ValueError) as exc:
+                raise ApiError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+            self._send_json(HTTPStatus.CREATED, {"dataset_id": dataset_id})
+        except ApiError as exc:
+            self._send_json(exc.status, {"error": exc.message})
+        except Exception:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "Impossibile leggere il file: verifica che sia un .xlsx valido."},
+            )
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8502,
+    max_workers: int = 4,
+    cache_entries: int = 256,
+    max_datasets: int = 16,
+    max_upload_bytes: int = 64 * 2**20,
+) -> MetricsApiServer:
+    """Create (but do not start) a metrics API server."""
+    return MetricsApiServer(
+        (host, port),
+        max_workers=max_workers,
+        cache_entries=cache_entries,
+        max_datasets=max_datasets,
+        max_upload_bytes=max_upload_bytes,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="DR Margin Tool JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cache-entries", type=int, default=256)
+    parser.add_argument("--max-datasets", type=int, default=16)
+    parser.add_argument("--max-upload-mb", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    server = create_server(
+        args.host,
+        args.port,
+        args.workers,
+        args.cache_entries,
+        args.max_datasets,
+        args.max_upload_mb * 2**20,
+    )
+    print(f"DR Margin Tool API in ascolto su http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
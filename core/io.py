@@ -6,8 +6,11 @@ import math
 import re
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from core.profiling import instrumented, stage
+
 
 REQUIRED_COLUMNS = [
     "categoria cliente",
@@ -50,6 +53,17 @@ HEADER_ALIASES = {
 
 HEADER_ALIASES_CF = {k.casefold(): v for k, v in HEADER_ALIASES.items()}
 
+NUMERIC_COLUMNS = ["quantità", "ultimo prezzo acquisto", "prezzo vendita"]
+
+# validate_sales_data reason code -> severity
+ISSUE_SEVERITY = {
+    "numero_non_valido": "scartata",
+    "prezzo_non_positivo": "scartata",
+    "acquisto_sopra_vendita": "sospetta",
+    "separatore_mancante": "sospetta",
+    "prezzo_anomalo": "sospetta",
+}
+
 
 class MissingColumnsError(ValueError):
     """Raised when required columns are missing from input data."""
@@ -100,6 +114,26 @@ def to_float_it(x: Any) -> float:
         return math.nan
 
 
+def to_float_it_series(values: pd.Series) -> pd.Series:
+    """Vectorized ``to_float_it`` for a whole column."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    mask = values.notna()
+    text = (
+        values[mask]
+        .astype(str)
+        .str.replace(r"[+%\s]", "", regex=True)
+    )
+    both = text.str.contains(",", regex=False) & text.str.contains(".", regex=False)
+    text = text.where(~both, text.str.replace(".", "", regex=False))
+    text = text.str.replace(",", ".", regex=False)
+
+    result = pd.Series(np.nan, index=values.index, dtype=float)
+    result[mask] = pd.to_numeric(text, errors="coerce").astype(float)
+    return result
+
+
 def _normalize_column_name(name: Any) -> str:
     name_str = str(name).strip()
     return re.sub(r"\s{2,}", " ", name_str)
@@ -134,8 +168,14 @@ def _detect_header_row(raw_df: pd.DataFrame, scan_limit: int = 10) -> int:
     return 0
 
 
-def load_sales_excel(file: Any) -> pd.DataFrame:
-    """Load and clean sales Excel data uploaded from Streamlit."""
+@instrumented
+def read_sales_excel(file: Any) -> pd.DataFrame:
+    """Read sales Excel data with canonical column names but raw values.
+
+    Header detection, alias renaming and the required-column check are
+    applied; numeric columns are left exactly as read so that
+    ``validate_sales_data`` can tell unparseable values from empty cells.
+    """
     file_name = getattr(file, "name", str(file))
     if not str(file_name).lower().endswith(".xlsx"):
         raise ValueError(
@@ -145,13 +185,16 @@ def load_sales_excel(file: Any) -> pd.DataFrame:
     if hasattr(file, "seek"):
         file.seek(0)
 
-    preview = pd.read_excel(file, header=None, nrows=30)
-    header_row = _detect_header_row(preview, scan_limit=30)
+    with stage("pd.read_excel (anteprima)"):
+        preview = pd.read_excel(file, header=None, nrows=30)
+        header_row = _detect_header_row(preview, scan_limit=30)
 
     if hasattr(file, "seek"):
         file.seek(0)
 
-    df = pd.read_excel(file, header=header_row)
+    with stage("pd.read_excel") as current:
+        df = pd.read_excel(file, header=header_row)
+        current.rows_out = len(df)
 
     df.columns = [_normalize_column_name(col) for col in df.columns]
     df = df.rename(
@@ -164,15 +207,137 @@ def load_sales_excel(file: Any) -> pd.DataFrame:
             "Colonne mancanti nel file Excel: " + ", ".join(missing)
         )
 
-    numeric_columns = ["quantità", "ultimo prezzo acquisto", "prezzo vendita"]
-    for col in numeric_columns:
-        df[col] = df[col].map(to_float_it)
+    return df
 
-    split_cols = df["MARCA / ARTICOLO"].astype(str).str.split("/", n=1, expand=True)
-    df["marca"] = split_cols[0].str.strip()
-    if split_cols.shape[1] > 1:
-        df["articolo"] = split_cols[1].str.strip()
-    else:
-        df["articolo"] = ""
+
+def parse_numeric_columns(raw_df: pd.DataFrame) -> dict[str, pd.Series]:
+    """Return ``NUMERIC_COLUMNS`` of *raw_df* converted with ``to_float_it_series``.
+
+    The result can be passed as *parsed* to both ``validate_sales_data`` and
+    ``clean_sales_data`` so the numbers are only parsed once.
+    """
+    with stage("to_float_it", rows_in=len(raw_df)):
+        return {col: to_float_it_series(raw_df[col]) for col in NUMERIC_COLUMNS}
+
+
+@instrumented
+def clean_sales_data(
+    raw_df: pd.DataFrame,
+    parsed: dict[str, pd.Series] | None = None,
+) -> pd.DataFrame:
+    """Return a copy of *raw_df* with parsed numbers and marca/articolo split.
+
+    *parsed* may hold the output of ``parse_numeric_columns(raw_df)``.
+    """
+    df = raw_df.copy()
+
+    if parsed is None:
+        parsed = parse_numeric_columns(raw_df)
+    for col in NUMERIC_COLUMNS:
+        df[col] = parsed[col]
+
+    with stage("split MARCA / ARTICOLO", rows_in=len(df)):
+        split_cols = df["MARCA / ARTICOLO"].astype(str).str.split("/", n=1, expand=True)
+        df["marca"] = split_cols[0].str.strip()
+        if split_cols.shape[1] > 1:
+            df["articolo"] = split_cols[1].str.strip()
+        else:
+            df["articolo"] = ""
 
     return df
+
+
+@instrumented
+def load_sales_excel(file: Any) -> pd.DataFrame:
+    """Load and clean sales Excel data uploaded from Streamlit."""
+    return clean_sales_data(read_sales_excel(file))
+
+
+@instrumented
+def validate_sales_data(
+    raw_df: pd.DataFrame,
+    outlier_factor: float = 3.0,
+    min_article_rows: int = 3,
+    parsed: dict[str, pd.Series] | None = None,
+) -> pd.DataFrame:
+    """Return one row per detected problem in *raw_df*.
+
+    *raw_df* should come from ``read_sales_excel`` (values not yet parsed);
+    an already cleaned frame works too, but then unparseable numbers cannot
+    be told apart from empty cells. All checks are vectorized.
+
+    Result columns:
+    - riga: index label of the offending row in *raw_df*
+    - colonna: column the problem was found in
+    - codice: reason code, one of ``ISSUE_SEVERITY``
+    - gravita: ``scartata`` (row is unusable) or ``sospetta``
+
+    A sale price is an outlier when it is more than *outlier_factor* times
+    above or below the median sale price of its ``MARCA / ARTICOLO``, for
+    articles with at least *min_article_rows* rows. *parsed* may hold the
+    output of ``parse_numeric_columns(raw_df)``.
+    """
+    positions: list[np.ndarray] = []
+    columns: list[str] = []
+    codes: list[str] = []
+
+    def add(mask: Any, column: str, code: str) -> None:
+        hits = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if len(hits):
+            positions.append(hits)
+            columns.append(column)
+            codes.append(code)
+
+    if parsed is None:
+        parsed = parse_numeric_columns(raw_df)
+    for col in NUMERIC_COLUMNS:
+        raw_values = raw_df[col]
+        invalid = (parsed[col].isna() & raw_values.notna()).to_numpy(copy=True)
+        unparsed_text = raw_values[invalid].astype(str).str.strip()
+        invalid[invalid] = (unparsed_text != "").to_numpy()
+        add(invalid, col, "numero_non_valido")
+
+    sale_price = parsed["prezzo vendita"]
+    purchase_price = parsed["ultimo prezzo acquisto"]
+    add(sale_price <= 0, "prezzo vendita", "prezzo_non_positivo")
+    add(purchase_price <= 0, "ultimo prezzo acquisto", "prezzo_non_positivo")
+    add(purchase_price > sale_price, "ultimo prezzo acquisto", "acquisto_sopra_vendita")
+
+    brand_item = raw_df["MARCA / ARTICOLO"]
+    has_separator = brand_item.astype(str).str.contains("/", regex=False)
+    add(~has_separator, "MARCA / ARTICOLO", "separatore_mancante")
+
+    article_codes, _ = pd.factorize(brand_item)
+    valid_price = sale_price.where(sale_price > 0)
+    by_article = valid_price.groupby(article_codes, sort=False)
+    article_median = by_article.transform("median").to_numpy()
+    article_rows = by_article.transform("count").to_numpy()
+    ratio = valid_price.to_numpy() / article_median
+    with np.errstate(invalid="ignore"):
+        outlier = (article_rows >= min_article_rows) & (
+            (ratio > outlier_factor) | (ratio < 1 / outlier_factor)
+        )
+    add(outlier, "prezzo vendita", "prezzo_anomalo")
+
+    if positions:
+        counts = [len(hits) for hits in positions]
+        all_positions = np.concatenate(positions)
+        all_columns = np.repeat(columns, counts)
+        all_codes = np.repeat(codes, counts)
+    else:
+        all_positions = np.array([], dtype=np.int64)
+        all_columns = np.array([], dtype=object)
+        all_codes = np.array([], dtype=object)
+
+    issues = pd.DataFrame(
+        {
+            "riga": raw_df.index.to_numpy()[all_positions],
+            "colonna": pd.Categorical(all_columns, categories=REQUIRED_COLUMNS),
+            "codice": pd.Categorical(all_codes, categories=list(ISSUE_SEVERITY)),
+        }
+    )
+    issues["gravita"] = pd.Categorical(
+        issues["codice"].map(ISSUE_SEVERITY).astype(object),
+        categories=["scartata", "sospetta"],
+    )
+    return issues.sort_values(["riga", "codice"], kind="stable").reset_index(drop=True)
@@ -5,6 +5,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from core.profiling import instrumented
+
 
 __all__ = [
     "REQUIRED_METRIC_COLUMNS",
@@ -17,7 +19,14 @@ __all__ = [
     "clienti_brand_opportunities",
     "article_summary",
     "segment_article_drilldown",
+    "segment_article_opportunities",
     "low_margin_articles",
+    "compare_periods",
+    "top_customers",
+    "pareto_abc",
+    "HIERARCHY_LEVELS",
+    "hierarchy_rollups",
+    "hierarchy_children",
 ]
 
 
@@ -28,7 +37,16 @@ REQUIRED_METRIC_COLUMNS = [
     "categoria cliente",
 ]
 
+# rollup level name -> grouping column, from the coarsest to the finest level
+HIERARCHY_LEVELS = {
+    "categoria": "categoria cliente",
+    "sottocategoria": "sottocategoria cliente",
+    "marca": "marca",
+    "articolo": "articolo",
+}
+
 
+@instrumented
 def add_margin_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Return a copy of *df* with revenue and margin columns.
 
@@ -54,6 +72,7 @@ def add_margin_columns(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
+@instrumented
 def segment_kpis(df: pd.DataFrame) -> pd.DataFrame:
     """Compute KPI aggregates for flotte, non_flotte, and totale segments."""
     categoria = pd.to_numeric(df["categoria cliente"], errors="coerce")
@@ -82,6 +101,7 @@ def segment_kpis(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame.from_dict(rows, orient="index")
 
 
+@instrumented
 def brand_summary(df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate revenue and margin metrics by brand."""
     grouped = (
@@ -100,6 +120,7 @@ def brand_summary(df: pd.DataFrame) -> pd.DataFrame:
     return grouped
 
 
+@instrumented
 def add_opportunity(df_brand: pd.DataFrame, target_pct: float) -> pd.DataFrame:
     """Add target and improvable euro margin based on target margin percent."""
     result = df_brand.copy()
@@ -110,6 +131,7 @@ def add_opportunity(df_brand: pd.DataFrame, target_pct: float) -> pd.DataFrame:
     return result
 
 
+@instrumented
 def flotte_brand_opportunities(df: pd.DataFrame, target_pct: float) -> pd.DataFrame:
     """Compute brand opportunities for fleet clients (categoria cliente == 46)."""
     categoria = pd.to_numeric(df["categoria cliente"], errors="coerce")
@@ -120,6 +142,7 @@ def flotte_brand_opportunities(df: pd.DataFrame, target_pct: float) -> pd.DataFr
     return with_opportunity.sort_values("migliorabile_euro", ascending=False)
 
 
+@instrumented
 def non_flotte_brand_opportunities(df: pd.DataFrame, target_pct: float) -> pd.DataFrame:
     """Compute brand opportunities for non-fleet clients (categoria cliente != 46)."""
     categoria = pd.to_numeric(df["categoria cliente"], errors="coerce")
@@ -130,11 +153,13 @@ def non_flotte_brand_opportunities(df: pd.DataFrame, target_pct: float) -> pd.Da
     return with_opportunity.sort_values("migliorabile_euro", ascending=False)
 
 
+@instrumented
 def clienti_brand_opportunities(df: pd.DataFrame, target_pct: float) -> pd.DataFrame:
     """Backward-compatible name used by app.py for non-fleet opportunities."""
     return non_flotte_brand_opportunities(df, target_pct)
 
 
+@instrumented
 def article_summary(df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate revenue, margin, and average price metrics by brand/article."""
     grouped = (
@@ -177,6 +202,7 @@ def _segment_filter(df: pd.DataFrame, segment: str) -> pd.DataFrame:
     raise ValueError("segment must be one of: tutti, flotte, clienti")
 
 
+@instrumented
 def segment_article_drilldown(
     df: pd.DataFrame,
     segment: str,
@@ -198,6 +224,21 @@ def segment_article_drilldown(
     )
 
 
+@instrumented
+def segment_article_opportunities(
+    df: pd.DataFrame,
+    segment: str,
+    target_pct: float,
+) -> pd.DataFrame:
+    """Return article summary with target and improvable margin for a segment."""
+    summary = article_summary(_segment_filter(df, segment))
+    summary["target_pct"] = target_pct
+    opportunity = (target_pct - summary["margine_pct"]) * summary["fatturato"]
+    summary["migliorabile_euro"] = opportunity.clip(lower=0)
+    return summary
+
+
+@instrumented
 def low_margin_articles(
     df: pd.DataFrame,
     segment: str,
@@ -214,3 +255,284 @@ def low_margin_articles(
         by=["margine_pct", "fatturato"],
         ascending=[True, False],
     )
+
+
+_PERIOD_VALUE_COLUMNS = ["fatturato", "margine_euro", "margine_pct", "migliorabile_euro"]
+
+
+def _factorize_keys(
+    previous: pd.DataFrame,
+    current: pd.DataFrame,
+    keys: list[str],
+) -> tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """Map key tuples of both frames onto one shared dense integer code space.
+
+    Each key column is factorized over the concatenation of both frames and
+    the per-column codes are combined into a single int64, which is then
+    factorized again. Returns the codes of *previous*, the codes of
+    *current*, and the key values for every code.
+    """
+    n_previous = len(previous)
+    combined = np.zeros(n_previous + len(current), dtype=np.int64)
+    for key in keys:
+        values = pd.concat([previous[key], current[key]], ignore_index=True)
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        combined = combined * max(len(uniques), 1) + codes
+
+    codes, _ = pd.factorize(combined)
+    _, first_position = np.unique(codes, return_index=True)
+
+    key_values = pd.concat(
+        [previous[keys], current[keys]], ignore_index=True
+    ).iloc[first_position].reset_index(drop=True)
+    return codes[:n_previous], codes[n_previous:], key_values
+
+
+@instrumented
+def compare_periods(
+    previous: pd.DataFrame,
+    current: pd.DataFrame,
+    target_pct: float,
+    segment: str = "tutti",
+    level: str = "articolo",
+    top_n: int | None = None,
+) -> pd.DataFrame:
+    """Compare two periods at brand (``level="marca"``) or article level.
+
+    Both frames must contain the columns added by ``add_margin_columns``.
+    For every key present in either period the result has ``<col>_prec``,
+    ``<col>_corr`` and ``delta_<col>`` for fatturato, margine_euro,
+    margine_pct and migliorabile_euro. Keys missing from one period count as
+    zero revenue there. Rows are sorted by ``delta_migliorabile_euro``
+    descending (biggest margin losses first), optionally limited to *top_n*.
+    """
+    if level == "marca":
+        keys = ["marca"]
+        summarize = brand_summary
+    elif level == "articolo":
+        keys = ["marca", "articolo"]
+        summarize = article_summary
+    else:
+        raise ValueError("level must be one of: marca, articolo")
+
+    summaries = []
+    for period_df in (previous, current):
+        summary = add_opportunity(summarize(_segment_filter(period_df, segment)), target_pct)
+        summaries.append(summary)
+    previous_summary, current_summary = summaries
+
+    previous_codes, current_codes, result = _factorize_keys(
+        previous_summary, current_summary, keys
+    )
+    n_keys = len(result)
+
+    for suffix, codes, summary in (
+        ("prec", previous_codes, previous_summary),
+        ("corr", current_codes, current_summary),
+    ):
+        for col in _PERIOD_VALUE_COLUMNS:
+            fill = np.nan if col == "margine_pct" else 0.0
+            values = np.full(n_keys, fill, dtype=float)
+            values[codes] = summary[col].to_numpy(dtype=float)
+            result[f"{col}_{suffix}"] = values
+
+    for col in _PERIOD_VALUE_COLUMNS:
+        result[f"delta_{col}"] = result[f"{col}_corr"] - result[f"{col}_prec"]
+
+    result = result.sort_values("delta_migliorabile_euro", ascending=False, kind="stable")
+    if top_n is not None:
+        result = result.head(top_n)
+    return result.reset_index(drop=True)
+
+
+@instrumented
+def top_customers(
+    df: pd.DataFrame,
+    segment: str,
+    target_pct: float,
+    k: int = 10,
+    by: str = "fatturato",
+) -> pd.DataFrame:
+    """Return the top *k* customers ("codice cliente") of a segment.
+
+    *by* is ``"fatturato"`` or ``"migliorabile_euro"`` (margin shortfall
+    against *target_pct*). Customer codes are factorized once and summed
+    exactly with ``np.bincount``; only the *k* best customers are then
+    selected with ``np.argpartition`` and sorted, so no full groupby or sort
+    over all customers is needed. Rows without a customer code are ignored;
+    an empty segment yields an empty frame.
+    """
+    if by not in ("fatturato", "migliorabile_euro"):
+        raise ValueError("by must be one of: fatturato, migliorabile_euro")
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if "codice cliente" not in df.columns:
+        raise ValueError("Colonna 'codice cliente' non presente nei dati")
+
+    segment_df = _segment_filter(
+        df[["categoria cliente", "codice cliente", "fatturato_riga", "margine_euro"]], segment
+    )
+    codes, customers = pd.factorize(segment_df["codice cliente"])
+    known = codes >= 0
+    codes = codes[known]
+    n_customers = len(customers)
+    fatturato = np.bincount(
+        codes,
+        weights=segment_df["fatturato_riga"].fillna(0).to_numpy(dtype=float)[known],
+        minlength=n_customers,
+    )
+    margine = np.bincount(
+        codes,
+        weights=segment_df["margine_euro"].fillna(0).to_numpy(dtype=float)[known],
+        minlength=n_customers,
+    )
+    migliorabile = np.clip(target_pct * fatturato - margine, 0, None)
+
+    ranked_values = fatturato if by == "fatturato" else migliorabile
+    if n_customers > k:
+        top = np.argpartition(-ranked_values, k - 1)[:k]
+    else:
+        top = np.arange(n_customers)
+    top = top[np.argsort(-ranked_values[top], kind="stable")]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margine_pct = np.where(fatturato[top] == 0, np.nan, margine[top] / fatturato[top])
+    return pd.DataFrame(
+        {
+            "codice cliente": customers.take(top),
+            "fatturato": fatturato[top],
+            "margine_euro": margine[top],
+            "margine_pct": margine_pct,
+            "target_pct": target_pct,
+            "migliorabile_euro": migliorabile[top],
+        }
+    )
+
+
+@instrumented
+def pareto_abc(
+    df: pd.DataFrame,
+    segment: str,
+    target_pct: float,
+    level: str = "marca",
+    metric: str = "migliorabile_euro",
+    a_share: float = 0.80,
+    b_share: float = 0.95,
+) -> pd.DataFrame:
+    """Classify brands or articles of a segment into ABC concentration classes.
+
+    Items are sorted once by *metric* (``fatturato`` or ``migliorabile_euro``)
+    descending and their cumulative share of the segment total is computed.
+    An item is class A while the share accumulated before it is below
+    *a_share*, B below *b_share*, C otherwise. Negative values count as zero.
+
+    Added columns: rank, quota, quota_cumulata, quota_elementi (cumulative
+    share of items, the x axis of the concentration curve) and classe.
+    """
+    if metric not in ("fatturato", "migliorabile_euro"):
+        raise ValueError("metric must be one of: fatturato, migliorabile_euro")
+    if level == "marca":
+        summarize = brand_summary
+    elif level == "articolo":
+        summarize = article_summary
+    else:
+        raise ValueError("level must be one of: marca, articolo")
+
+    summary = add_opportunity(summarize(_segment_filter(df, segment)), target_pct)
+
+    values = np.clip(summary[metric].fillna(0).to_numpy(dtype=float), 0, None)
+    order = np.argsort(-values, kind="stable")
+    result = summary.iloc[order].reset_index(drop=True)
+    sorted_values = values[order]
+
+    total = sorted_values.sum()
+    cumulative = np.cumsum(sorted_values)
+    if total > 0:
+        share = sorted_values / total
+        cumulative_share = cumulative / total
+    else:
+        share = np.zeros_like(sorted_values)
+        cumulative_share = np.zeros_like(sorted_values)
+    share_before = cumulative_share - share
+
+    n_items = len(result)
+    result["rank"] = np.arange(1, n_items + 1)
+    result["quota"] = share
+    result["quota_cumulata"] = cumulative_share
+    result["quota_elementi"] = result["rank"] / max(n_items, 1)
+    result["classe"] = np.select(
+        [(share > 0) & (share_before < a_share), (share > 0) & (share_before < b_share)],
+        ["A", "B"],
+        default="C",
+    )
+    return result
+
+
+@instrumented
+def hierarchy_rollups(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Aggregate every level of the categoria → sottocategoria → marca → articolo tree.
+
+    The row data is grouped once at article level; each coarser level is
+    then obtained by summing the partial sums of the level below, so the
+    rows are scanned a single time. Returns a dict keyed like
+    ``HIERARCHY_LEVELS``; every frame is indexed by that level's key path
+    (e.g. ``("46", "A1", "BRAND")`` for ``marca``) and sorted; read the
+    children of a node with ``hierarchy_children``, which also matches NaN
+    keys that ``.loc`` cannot look up in a MultiIndex.
+
+    Columns: righe, quantità, fatturato, margine_euro, margine_pct.
+    Opportunity columns are left to ``add_opportunity`` since targets
+    change more often than the data.
+    """
+    if "sottocategoria cliente" not in df.columns:
+        raise ValueError("Colonna 'sottocategoria cliente' non presente nei dati")
+
+    level_names = list(HIERARCHY_LEVELS)
+    key_columns = list(HIERARCHY_LEVELS.values())
+
+    partial = df.groupby(key_columns, dropna=False, sort=False).agg(
+        righe=("fatturato_riga", "size"),
+        quantità=("quantità", "sum"),
+        fatturato=("fatturato_riga", "sum"),
+        margine_euro=("margine_euro", "sum"),
+    )
+
+    rollups = {level_names[-1]: partial}
+    for depth in range(len(key_columns) - 1, 0, -1):
+        partial = partial.groupby(level=list(range(depth)), dropna=False, sort=False).sum()
+        rollups[level_names[depth - 1]] = partial
+
+    for level_name, level_df in rollups.items():
+        level_df = level_df.sort_index()
+        level_df["margine_pct"] = np.where(
+            level_df["fatturato"] == 0,
+            np.nan,
+            level_df["margine_euro"] / level_df["fatturato"],
+        )
+        rollups[level_name] = level_df
+
+    return {level_name: rollups[level_name] for level_name in level_names}
+
+
+@instrumented
+def hierarchy_children(rollups: dict[str, pd.DataFrame], path: tuple = ()) -> pd.DataFrame:
+    """Return the children of the node at *path* from ``hierarchy_rollups`` output.
+
+    An empty *path* returns the categoria level; ``(categoria,)`` returns its
+    sottocategorie, and so on. Rows are selected with a boolean mask over
+    the index levels so that missing keys (NaN) are matched as well.
+    """
+    level_names = list(HIERARCHY_LEVELS)
+    if len(path) >= len(level_names):
+        raise ValueError("path is deeper than the hierarchy")
+
+    level_df = rollups[level_names[len(path)]]
+    mask = np.ones(len(level_df), dtype=bool)
+    for depth, key in enumerate(path):
+        values = level_df.index.get_level_values(depth)
+        mask &= values.isna() if pd.isna(key) else values == key
+
+    children = level_df.loc[mask]
+    if path:
+        children = children.droplevel(list(range(len(path))))
+    return children
@@ -0,0 +1,221 @@
+"""Opt-in per-stage timing and memory instrumentation.
+
+Stages are recorded only inside a ``recording()`` block; elsewhere
+``stage()`` returns a shared no-op object and ``@instrumented`` functions
+cost one context variable lookup per call. Each finished recording is also
+logged as one JSON line per stage on the ``core.profiling`` logger; call
+``enable_json_log()`` to actually emit those lines.
+
+Memory peaks come from tracemalloc, which is process-wide: with several
+sessions recording at once the figures are approximate. Tracing allocations
+also slows pandas code down by an order of magnitude, so record with
+``track_memory=False`` when the timings matter.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterator, TypeVar
+
+import pandas as pd
+
+
+__all__ = [
+    "StageRecord",
+    "StageRecorder",
+    "enable_json_log",
+    "instrumented",
+    "recording",
+    "stage",
+]
+
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_active_recorder: ContextVar[StageRecorder | None] = ContextVar("_active_recorder", default=None)
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one finished stage."""
+
+    name: str
+    depth: int
+    seconds: float
+    rows_in: int | None
+    rows_out: int | None
+    peak_mb: float | None
+
+
+class StageRecorder:
+    """Collects ``StageRecord`` entries for one recording block."""
+
+    def __init__(self, track_memory: bool = True) -> None:
+        self.track_memory = track_memory
+        self.records: list[StageRecord] = []
+        self._stack: list[_Stage] = []
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(record) for record in self.records])
+
+    def _traced(self) -> tuple[int, int] | None:
+        if self.track_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()
+        return None
+
+    def _enter(self, current: _Stage) -> None:
+        traced = self._traced()
+        if traced is not None:
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, traced[1])
+            tracemalloc.reset_peak()
+            current.start_memory = traced[0]
+            current.peak = traced[0]
+        current.depth = len(self._stack)
+        current.slot = len(self.records)
+        # Reserve the slot now so records stay in start order; filled on exit.
+        self.records.append(None)  # type: ignore[arg-type]
+        self._stack.append(current)
+
+    def _exit(self, current: _Stage, seconds: float) -> None:
+        self._stack.pop()
+        peak_mb = None
+        traced = self._traced()
+        if traced is not None and current.start_memory is not None:
+            current.peak = max(current.peak, traced[1])
+            peak_mb = (current.peak - current.start_memory) / 2**20
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, current.peak)
+            tracemalloc.reset_peak()
+
+        self.records[current.slot] = StageRecord(
+            name=current.name,
+            depth=current.depth,
+            seconds=seconds,
+            rows_in=current.rows_in,
+            rows_out=current.rows_out,
+            peak_mb=peak_mb,
+        )
+
+
+class _Stage:
+    """Context manager measuring one stage; set ``rows_out`` before exit."""
+
+    def __init__(self, recorder: StageRecorder, name: str, rows_in: int | None) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: int | None = None
+        self.depth = 0
+        self.slot = 0
+        self.start_memory: int | None = None
+        self.peak = 0
+        self._start = 0.0
+
+    def __enter__(self) -> _Stage:
+        self.recorder._enter(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.recorder._exit(self, time.perf_counter() - self._start)
+
+
+class _NullStage:
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self) -> _NullStage:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, rows_in: int | None = None) -> _Stage | _NullStage:
+    """Return a context manager timing *name* when a recording is active."""
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name, rows_in)
+
+
+def _row_count(value: Any) -> int | None:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def instrumented(func: F) -> F:
+    """Record calls to *func* as a stage named after it.
+
+    ``rows_in`` is the length of the first argument and ``rows_out`` the
+    length of the result, when those are pandas objects.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        recorder = _active_recorder.get()
+        if recorder is None:
+            return func(*args, **kwargs)
+
+        rows_in = _row_count(args[0]) if args else None
+        with _Stage(recorder, func.__name__, rows_in) as current:
+            result = func(*args, **kwargs)
+            current.rows_out = _row_count(result)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+@contextmanager
+def recording(enabled: bool = True, track_memory: bool = True) -> Iterator[StageRecorder | None]:
+    """Record stages executed in this block; yields ``None`` when disabled."""
+    if not enabled:
+        yield None
+        return
+
+    recorder = StageRecorder(track_memory=track_memory)
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _active_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active_recorder.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
+        if logger.isEnabledFor(logging.INFO):
+            for record in recorder.records:
+                logger.info(json.dumps(asdict(record), ensure_ascii=False))
+
+
+def enable_json_log(level: int = logging.INFO) -> None:
+    """Emit the ``core.profiling`` JSON lines at *level* on stderr.
+
+    The stream handler is attached only if the logger has none yet, so
+    calling this on every Streamlit rerun is safe.
+    """
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
@@ -1 +1,191 @@
-"""Reports module placeholder for future report generation."""
+"""Excel report generation for DR Margin Tool.
+
+Reports are written with openpyxl's write-only workbook, which streams rows
+to disk sheet by sheet instead of building the whole workbook in memory.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from core.metrics import (
+    clienti_brand_opportunities,
+    flotte_brand_opportunities,
+    low_margin_articles,
+    segment_article_opportunities,
+    segment_kpis,
+)
+
+
+__all__ = [
+    "SHEET_NAME_MAX_LENGTH",
+    "iter_brand_drilldowns",
+    "write_margin_report",
+]
+
+
+SHEET_NAME_MAX_LENGTH = 31
+
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+_DRILLDOWN_COLUMNS = [
+    "articolo",
+    "quantità",
+    "fatturato",
+    "margine_euro",
+    "margine_pct",
+    "prezzo_vendita_medio",
+    "costo_medio",
+    "target_pct",
+    "migliorabile_euro",
+]
+
+_NUMBER_FORMATS = {
+    "fatturato": "#,##0.00 €",
+    "fatturato_totale": "#,##0.00 €",
+    "margine_euro": "#,##0.00 €",
+    "margine_totale": "#,##0.00 €",
+    "migliorabile_euro": "#,##0.00 €",
+    "prezzo_vendita_medio": "#,##0.00 €",
+    "costo_medio": "#,##0.00 €",
+    "margine_pct": "0.00%",
+    "margine_medio_pct": "0.00%",
+    "target_pct": "0.00%",
+    "quantità": "#,##0.00",
+}
+
+
+def _sheet_title(name: Any, prefix: str, used: set[str]) -> str:
+    """Return a unique Excel-safe sheet title built from *prefix* and *name*."""
+    base = _INVALID_SHEET_CHARS.sub("_", f"{prefix}{name}").strip("'") or prefix
+    title = base[:SHEET_NAME_MAX_LENGTH]
+    counter = 2
+    while title.casefold() in used:
+        suffix = f" ({counter})"
+        title = base[: SHEET_NAME_MAX_LENGTH - len(suffix)] + suffix
+        counter += 1
+    used.add(title.casefold())
+    return title
+
+
+def _cell_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+        if isinstance(value, float) and np.isnan(value):
+            return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def _stream_frame(workbook: Workbook, title: str, frame: pd.DataFrame, index: bool = False) -> None:
+    """Append *frame* to a new write-only sheet, one row at a time."""
+    sheet = workbook.create_sheet(title=title)
+    if index:
+        frame = frame.reset_index()
+
+    columns = [str(col) for col in frame.columns]
+    header = []
+    for col in columns:
+        cell = WriteOnlyCell(sheet, value=col)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+
+    formats = [_NUMBER_FORMATS.get(col) for col in columns]
+    for row in frame.itertuples(index=False, name=None):
+        cells = []
+        for value, number_format in zip(row, formats):
+            cell = WriteOnlyCell(sheet, value=_cell_value(value))
+            if number_format is not None:
+                cell.number_format = number_format
+            cells.append(cell)
+        sheet.append(cells)
+
+
+def iter_brand_drilldowns(
+    df: pd.DataFrame,
+    segment: str,
+    target_pct: float,
+    brands: Iterable[Any],
+) -> Iterator[tuple[Any, pd.DataFrame]]:
+    """Yield ``(marca, drilldown)`` pairs for *brands* in the given order.
+
+    Equivalent to calling ``segment_article_drilldown`` once per brand, but
+    the segment is filtered and aggregated a single time and each brand frame
+    is produced lazily, so only one drilldown is alive at any moment.
+    """
+    summary = segment_article_opportunities(df, segment, target_pct)
+
+    positions = summary.groupby("marca", dropna=False, sort=False).indices
+    for brand in brands:
+        rows = positions.get(brand)
+        if rows is None:
+            continue
+        drilldown = summary.iloc[rows].sort_values(
+            by=["margine_pct", "fatturato"],
+            ascending=[True, False],
+        )
+        yield brand, drilldown
+
+
+def write_margin_report(
+    df: pd.DataFrame,
+    destination: Any,
+    target_flotte_pct: float,
+    target_clienti_pct: float,
+    threshold_pct: float = 0.10,
+    min_fatturato: float = 0,
+    segment: str = "tutti",
+    include_drilldowns: bool = True,
+) -> None:
+    """Write a multi-sheet xlsx margin report to *destination*.
+
+    *df* must already contain the columns added by ``add_margin_columns``.
+    *destination* may be a path or a binary file-like object. Sheets:
+    KPI, Flotte, Clienti, Sotto soglia (articles of *segment* below
+    *threshold_pct*) and, when *include_drilldowns* is true, one article
+    drilldown per brand prefixed with ``F -`` (Flotte) or ``C -`` (Clienti).
+    """
+    workbook = Workbook(write_only=True)
+    used_titles: set[str] = set()
+
+    kpi_df = segment_kpis(df)
+    _stream_frame(workbook, _sheet_title("KPI", "", used_titles), kpi_df.rename_axis("segmento"), index=True)
+
+    flotte_df = flotte_brand_opportunities(df, target_flotte_pct)
+    _stream_frame(workbook, _sheet_title("Flotte", "", used_titles), flotte_df)
+
+    clienti_df = clienti_brand_opportunities(df, target_clienti_pct)
+    _stream_frame(workbook, _sheet_title("Clienti", "", used_titles), clienti_df)
+
+    low_margin_df = low_margin_articles(
+        df,
+        segment=segment,
+        threshold_pct=threshold_pct,
+        min_fatturato=min_fatturato,
+    )
+    _stream_frame(workbook, _sheet_title("Sotto soglia", "", used_titles), low_margin_df)
+
+    if include_drilldowns:
+        drilldown_plan = [
+            ("flotte", "F - ", target_flotte_pct, flotte_df["marca"].tolist()),
+            ("clienti", "C - ", target_clienti_pct, clienti_df["marca"].tolist()),
+        ]
+        for drilldown_segment, prefix, target_pct, brands in drilldown_plan:
+            for brand, drilldown in iter_brand_drilldowns(df, drilldown_segment, target_pct, brands):
+                title = _sheet_title(brand, prefix, used_titles)
+                _stream_frame(workbook, title, drilldown[_DRILLDOWN_COLUMNS])
+
+    workbook.save(destination)
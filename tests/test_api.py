@@ -0,0 +1,160 @@
+import http.client
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from core import api
+from core.api import ResponseCache, create_server
+
+
+def _sales_workbook_bytes(quantity="2,00"):
+    source_df = pd.DataFrame(
+        {
+            "CT": [46, 46, 10],
+            "MARCA / ARTICOLO": ["Alfa / uno", "Beta / due", "Alfa / tre"],
+            "Q.TA'": ["10,00", "5,00", quantity],
+            "PRZ. ULT.ACQ.": ["6,00", "9,00", "3,00"],
+            "PREZZO SC.": ["10,00", "10,00", "4,00"],
+        }
+    )
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        source_df.to_excel(writer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def api_url():
+    server = create_server(port=0, max_workers=2, max_datasets=1, max_upload_bytes=1_000_000)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(url, data=None, headers=None):
+    request = urllib.request.Request(url, data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put(("a",), b"1")
+    cache.put(("b",), b"2")
+    cache.get(("a",))
+    cache.put(("c",), b"3")
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",))[1] == b"1"
+    assert len(cache) == 2
+
+
+def test_api_registers_dataset_and_serves_cached_json(api_url):
+    base_url, server = api_url
+    content = _sales_workbook_bytes()
+
+    status, _, body = _request(f"{base_url}/datasets", data=content)
+    assert status == 201
+    dataset_id = json.loads(body)["dataset_id"]
+
+    status, _, body = _request(f"{base_url}/datasets", data=content)
+    assert json.loads(body)["dataset_id"] == dataset_id
+
+    url = f"{base_url}/datasets/{dataset_id}/flotte_brand_opportunities?target_pct=0.5"
+    status, headers, body = _request(url)
+    assert status == 200
+    records = json.loads(body)
+    assert {record["marca"] for record in records} == {"Alfa", "Beta"}
+    assert len(server.cache) == 1
+
+    status, _, _ = _request(url, headers={"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert len(server.cache) == 1
+
+    status, _, body = _request(f"{base_url}/datasets/{dataset_id}/segment_kpis")
+    kpis = {record["segmento"]: record for record in json.loads(body)}
+    assert kpis["totale"]["fatturato_totale"] == pytest.approx(158.0)
+
+
+def test_api_reports_bad_requests(api_url):
+    base_url, _ = api_url
+
+    status, _, _ = _request(f"{base_url}/datasets/unknown/segment_kpis")
+    assert status == 404
+
+    status, _, body = _request(f"{base_url}/datasets", data=_sales_workbook_bytes())
+    dataset_id = json.loads(body)["dataset_id"]
+
+    status, _, body = _request(f"{base_url}/datasets/{dataset_id}/low_margin_articles")
+    assert status == 400
+    assert "threshold_pct" in json.loads(body)["error"]
+
+    status, _, _ = _request(f"{base_url}/datasets/{dataset_id}/not_a_metric")
+    assert status == 404
+
+
+def test_api_rejects_oversized_uploads(api_url):
+    _, server = api_url
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    connection.putrequest("POST", "/datasets")
+    connection.putheader("Content-Length", "1000001")
+    connection.endheaders()
+    response = connection.getresponse()
+
+    assert response.status == 413
+    assert "troppo grande" in json.loads(response.read())["error"]
+    connection.close()
+
+
+def test_api_evicts_least_recently_used_dataset(api_url):
+    base_url, server = api_url
+    _, _, body = _request(f"{base_url}/datasets", data=_sales_workbook_bytes())
+    first_id = json.loads(body)["dataset_id"]
+    _request(f"{base_url}/datasets/{first_id}/segment_kpis")
+    assert len(server.cache) == 1
+
+    status, _, body = _request(f"{base_url}/datasets", data=_sales_workbook_bytes(quantity="3,00"))
+    assert status == 201
+
+    assert server.registry.ids() == [json.loads(body)["dataset_id"]]
+    assert len(server.cache) == 0
+    status, _, _ = _request(f"{base_url}/datasets/{first_id}/segment_kpis")
+    assert status == 404
+
+
+def test_compute_runs_concurrent_misses_once(api_url, monkeypatch):
+    _, server = api_url
+    server.registry._datasets["d"] = pd.DataFrame({"x": [1]})
+    calls = []
+
+    def slow_endpoint(df):
+        calls.append(1)
+        time.sleep(0.2)
+        return df
+
+    monkeypatch.setitem(api.ENDPOINTS, "slow", (slow_endpoint, lambda params: {}))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(server.compute("d", "slow", {})))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(set(results)) == 1
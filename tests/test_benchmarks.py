@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from benchmarks.session_benchmark import latency_report, run_session_benchmark
+from benchmarks.run import _cases, find_regressions, uncovered_functions
+from benchmarks.synthetic import generate_sales_export, read_csv_export, write_csv, write_xlsx
+from core.io import load_sales_excel
+
+
+def test_generate_sales_export_is_seeded_and_uses_italian_numbers():
+    first = generate_sales_export(200, seed=7)
+    second = generate_sales_export(200, seed=7)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert first["PREZZO SC."].str.contains(",").mean() > 0.9
+
+
+def test_generated_exports_load_through_core_io(tmp_path):
+    export = generate_sales_export(300, seed=1, dirty_fraction=0)
+
+    xlsx_path = tmp_path / "vendite.xlsx"
+    write_xlsx(export, xlsx_path)
+    loaded = load_sales_excel(xlsx_path)
+
+    assert len(loaded) == 300
+    assert loaded["prezzo vendita"].notna().all()
+    assert set(loaded["marca"].str[:5]) == {"MARCA"}
+
+    csv_path = tmp_path / "vendite.csv"
+    write_csv(export, csv_path)
+    pd.testing.assert_series_equal(
+        read_csv_export(csv_path)["prezzo vendita"],
+        export["PREZZO SC."].astype(str),
+        check_names=False,
+    )
+
+
+def test_find_regressions_respects_relative_and_absolute_tolerance():
+    baseline = {"1000": {"f": {"seconds": 1.0, "peak_mb": 10.0}}}
+    results = {
+        "1000": {"f": {"seconds": 1.2, "peak_mb": 20.0}},
+        "2000": {"f": {"seconds": 9.0, "peak_mb": 90.0}},
+    }
+
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1
+    assert "peak_mb" in regressions[0]
+    assert find_regressions(results, baseline, tolerance=0.25, min_delta_mb=50.0) == []
+
+
+def test_latency_report_computes_percentiles():
+    report = latency_report({"target": [0.1, 0.2, 0.3, 0.4], "marca": [1.0]})
+
+    assert report.loc["target", "n"] == 4
+    assert report.loc["target", "p50"] == pytest.approx(0.25)
+    assert report.loc["marca", "max"] == pytest.approx(1.0)
+
+
+def test_session_benchmark_drives_app_sessions_without_errors():
+    report, memory, errors = run_session_benchmark(
+        sessions=2, n_rows=200, rounds=1, timeout=60, workers=2
+    )
+
+    assert errors == []
+    assert set(report.index) == {"avvio", "caricamento file", "target", "marca", "soglia"}
+    assert report.loc["target", "n"] == 4
+    assert memory["rss_picco_sessione_mb"] >= memory["rss_base_processo_mb"] > 0
+    assert memory["rss_per_sessione_max_mb"] >= memory["rss_per_sessione_medio_mb"]
+
+
+def test_every_public_function_has_a_benchmark_case(tmp_path):
+    cases = _cases(1_000, tmp_path, xlsx_max_rows=1_000)
+
+    assert uncovered_functions(cases) == []
+    assert "core.metrics.top_customers" in uncovered_functions(
+        name for name in cases if name != "top_customers"
+    )
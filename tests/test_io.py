@@ -8,7 +8,16 @@ import math
 import pandas as pd
 import pytest
 
-from core.io import HEADER_ALIASES_CF, _detect_header_row, load_sales_excel, to_float_it
+from core.io import (
+    HEADER_ALIASES_CF,
+    _detect_header_row,
+    clean_sales_data,
+    load_sales_excel,
+    parse_numeric_columns,
+    to_float_it,
+    to_float_it_series,
+    validate_sales_data,
+)
 
 
 @pytest.mark.parametrize(
@@ -48,7 +57,16 @@ import math
 import pandas as pd
 import pytest
 
-from core.io import HEADER_ALIASES_CF, _detect_header_row, load_sales_excel, to_float_it
+from core.io import (
+    HEADER_ALIASES_CF,
+    _detect_header_row,
+    clean_sales_data,
+    load_sales_excel,
+    parse_numeric_columns,
+    to_float_it,
+    to_float_it_series,
+    validate_sales_data,
+)
 
 
 @pytest.mark.parametrize(
@@ -128,4 +146,59 @@ def test_load_sales_excel_accepts_abbreviated_headers():
     ],
 )
 def test_header_aliases_include_recent_variants(header, expected):
-    assert HEADER_ALIASES_CF[header.casefold()] == expected
\ No newline at end of file
+    assert HEADER_ALIASES_CF[header.casefold()] == expected
+
+
+def test_to_float_it_series_matches_scalar_conversion():
+    values = pd.Series(["6,17000", "1.234,50", "+102,59%", "", None, "abc", 12, 3.5], dtype=object)
+
+    result = to_float_it_series(values)
+    expected = values.map(to_float_it)
+
+    pd.testing.assert_series_equal(result, expected.astype(float), check_names=False)
+
+
+def test_validate_sales_data_reports_reason_codes():
+    raw_df = pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 46, 46, 10, 10],
+            "MARCA / ARTICOLO": ["A / x", "A / x", "A / x", "A / x", "senza separatore", "B / y"],
+            "quantità": ["1,00", "1,00", "1,00", "dieci", "1,00", ""],
+            "ultimo prezzo acquisto": ["5,00", "5,00", "5,00", "5,00", "12,00", "1,00"],
+            "prezzo vendita": ["10,00", "10,00", "10,00", "100,00", "10,00", "0"],
+        }
+    )
+
+    issues = validate_sales_data(raw_df)
+    found = set(zip(issues["riga"], issues["codice"]))
+
+    assert found == {
+        (3, "numero_non_valido"),
+        (3, "prezzo_anomalo"),
+        (4, "separatore_mancante"),
+        (4, "acquisto_sopra_vendita"),
+        (5, "prezzo_non_positivo"),
+        (5, "acquisto_sopra_vendita"),
+    }
+    assert set(issues.loc[issues["riga"] == 5, "gravita"]) == {"scartata", "sospetta"}
+    assert validate_sales_data(raw_df.iloc[:3]).empty
+
+
+def test_validate_and_clean_reuse_parsed_columns():
+    raw_df = pd.DataFrame(
+        {
+            "categoria cliente": [46, 10],
+            "MARCA / ARTICOLO": ["A / x", "B / y"],
+            "quantità": ["1,00", "dieci"],
+            "ultimo prezzo acquisto": ["5,00", "2,00"],
+            "prezzo vendita": ["10,00", "4,00"],
+        }
+    )
+    parsed = parse_numeric_columns(raw_df)
+
+    pd.testing.assert_frame_equal(
+        validate_sales_data(raw_df, parsed=parsed), validate_sales_data(raw_df)
+    )
+    pd.testing.assert_frame_equal(
+        clean_sales_data(raw_df, parsed=parsed), clean_sales_data(raw_df)
+    )
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -5,11 +6,16 @@ from core.metrics import (
     add_margin_columns,
     add_opportunity,
     clienti_brand_opportunities,
+    compare_periods,
     flotte_brand_opportunities,
+    hierarchy_children,
+    hierarchy_rollups,
     low_margin_articles,
     non_flotte_brand_opportunities,
+    pareto_abc,
     segment_article_drilldown,
     segment_kpis,
+    top_customers,
 )
 
 
@@ -158,3 +164,159 @@ def test_segment_article_drilldown_filters_selected_brand_and_sorts_by_margin_pc
     assert set(result["marca"]) == {"A"}
     assert list(result["articolo"]) == ["low", "mid", "high"]
     assert result["margine_pct"].is_monotonic_increasing
+
+
+def test_compare_periods_joins_articles_and_sorts_biggest_losses_first():
+    previous = pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 10],
+            "marca": ["A", "A", "B"],
+            "articolo": ["x", "y", "z"],
+            "quantità": [1.0, 1.0, 1.0],
+            "fatturato_riga": [100.0, 100.0, 100.0],
+            "margine_euro": [50.0, 40.0, 30.0],
+            "costo_riga": [50.0, 60.0, 70.0],
+        }
+    )
+    current = pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 10],
+            "marca": ["A", "A", "C"],
+            "articolo": ["x", "y", "new"],
+            "quantità": [1.0, 1.0, 1.0],
+            "fatturato_riga": [100.0, 200.0, 50.0],
+            "margine_euro": [20.0, 80.0, 25.0],
+            "costo_riga": [80.0, 120.0, 25.0],
+        }
+    )
+
+    result = compare_periods(previous, current, target_pct=0.5)
+
+    assert len(result) == 4
+    by_key = result.set_index(["marca", "articolo"])
+    assert by_key.loc[("A", "x"), "delta_margine_pct"] == pytest.approx(-0.3)
+    assert by_key.loc[("A", "x"), "delta_migliorabile_euro"] == pytest.approx(30.0)
+    assert by_key.loc[("A", "y"), "delta_fatturato"] == pytest.approx(100.0)
+    assert by_key.loc[("B", "z"), "fatturato_corr"] == pytest.approx(0.0)
+    assert pd.isna(by_key.loc[("C", "new"), "margine_pct_prec"])
+    assert result["delta_migliorabile_euro"].is_monotonic_decreasing
+    assert list(result.loc[0, ["marca", "articolo"]]) == ["A", "x"]
+
+    brand_result = compare_periods(previous, current, target_pct=0.5, segment="flotte", level="marca", top_n=1)
+    assert list(brand_result["marca"]) == ["A"]
+    assert brand_result.loc[0, "fatturato_corr"] == pytest.approx(300.0)
+
+
+def test_top_customers_matches_exact_ranking():
+    rng = np.random.default_rng(0)
+    n_rows = 5_000
+    df = pd.DataFrame(
+        {
+            "categoria cliente": rng.choice([46, 10], n_rows),
+            "codice cliente": (rng.zipf(1.5, n_rows) % 500).astype(str),
+            "fatturato_riga": rng.gamma(2.0, 50.0, n_rows),
+        }
+    )
+    df["margine_euro"] = df["fatturato_riga"] * rng.uniform(-0.1, 0.6, n_rows)
+
+    for by in ("fatturato", "migliorabile_euro"):
+        result = top_customers(df, "clienti", 0.45, k=5, by=by)
+
+        clienti = df.loc[df["categoria cliente"] != 46]
+        exact = clienti.groupby("codice cliente").agg(
+            fatturato=("fatturato_riga", "sum"),
+            margine_euro=("margine_euro", "sum"),
+        )
+        exact["migliorabile_euro"] = (0.45 * exact["fatturato"] - exact["margine_euro"]).clip(lower=0)
+        expected = exact.sort_values(by, ascending=False).head(5)
+
+        assert list(result["codice cliente"]) == list(expected.index)
+        assert result[by].to_numpy() == pytest.approx(expected[by].to_numpy())
+
+
+def test_top_customers_returns_empty_ranking_for_empty_segment():
+    df = pd.DataFrame(
+        {
+            "categoria cliente": [10, 10],
+            "codice cliente": ["C1", None],
+            "fatturato_riga": [100.0, 50.0],
+            "margine_euro": [30.0, 10.0],
+        }
+    )
+
+    result = top_customers(df, "flotte", 0.45)
+
+    assert result.empty
+    assert list(result.columns) == [
+        "codice cliente",
+        "fatturato",
+        "margine_euro",
+        "margine_pct",
+        "target_pct",
+        "migliorabile_euro",
+    ]
+    assert top_customers(df.iloc[1:], "clienti", 0.45).empty
+
+
+def test_top_customers_requires_customer_column():
+    df = pd.DataFrame({"categoria cliente": [46], "fatturato_riga": [1.0], "margine_euro": [0.5]})
+
+    with pytest.raises(ValueError):
+        top_customers(df, "tutti", 0.45)
+
+
+def test_pareto_abc_classifies_by_cumulative_share():
+    df = pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 46, 46, 10],
+            "marca": ["A", "B", "C", "D", "E"],
+            "fatturato_riga": [700.0, 200.0, 60.0, 40.0, 5000.0],
+            "margine_euro": [0.0, 0.0, 0.0, 0.0, 0.0],
+        }
+    )
+
+    result = pareto_abc(df, "flotte", target_pct=0.5, level="marca", metric="fatturato")
+
+    assert list(result["marca"]) == ["A", "B", "C", "D"]
+    assert list(result["classe"]) == ["A", "A", "B", "C"]
+    assert result["quota_cumulata"].iloc[-1] == pytest.approx(1.0)
+    assert list(result["rank"]) == [1, 2, 3, 4]
+    assert result["quota_elementi"].iloc[1] == pytest.approx(0.5)
+
+    by_opportunity = pareto_abc(df, "flotte", target_pct=0.5, level="marca")
+    assert by_opportunity.loc[0, "migliorabile_euro"] == pytest.approx(350.0)
+
+
+def test_hierarchy_rollups_sum_every_level_from_partial_sums():
+    df = pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 46, 10, 10],
+            "sottocategoria cliente": ["A1", "A1", "A2", "B1", None],
+            "marca": ["X", "X", "Y", "X", "Z"],
+            "articolo": ["1", "2", "1", "1", "9"],
+            "quantità": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "fatturato_riga": [10.0, 20.0, 30.0, 40.0, 50.0],
+            "margine_euro": [1.0, 4.0, 6.0, 10.0, 5.0],
+        }
+    )
+
+    rollups = hierarchy_rollups(df)
+
+    assert list(rollups) == ["categoria", "sottocategoria", "marca", "articolo"]
+    assert rollups["categoria"].loc[46, "fatturato"] == pytest.approx(60.0)
+    assert rollups["categoria"].loc[46, "righe"] == 3
+    assert rollups["categoria"].loc[10, "margine_pct"] == pytest.approx(15.0 / 90.0)
+    assert rollups["marca"].loc[(46, "A1", "X"), "quantità"] == pytest.approx(3.0)
+    assert len(rollups["articolo"]) == 5
+
+    sottocategorie = hierarchy_children(rollups, (10,))
+    assert len(sottocategorie) == 2
+    assert hierarchy_children(rollups, (10, None))["fatturato"].tolist() == [50.0]
+    assert hierarchy_children(rollups, (46, "A1", "X")).index.tolist() == ["1", "2"]
+
+
+def test_hierarchy_rollups_requires_subcategory_column():
+    df = pd.DataFrame({"categoria cliente": [46], "fatturato_riga": [1.0], "margine_euro": [0.5]})
+
+    with pytest.raises(ValueError):
+        hierarchy_rollups(df)
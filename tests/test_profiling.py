@@ -0,0 +1,99 @@
+import json
+import logging
+from pathlib import Path
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import generate_sales_export, write_xlsx
+from core.metrics import add_margin_columns, flotte_brand_opportunities
+from core.profiling import instrumented, logger, recording, stage
+
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app.py"
+
+
+def _sample_data():
+    return add_margin_columns(
+        pd.DataFrame(
+            {
+                "categoria cliente": [46, 46, 10],
+                "marca": ["A", "B", "A"],
+                "prezzo vendita": [10.0, 20.0, 30.0],
+                "ultimo prezzo acquisto": [5.0, 15.0, 20.0],
+                "quantità": [1.0, 2.0, 3.0],
+            }
+        )
+    )
+
+
+def test_stage_is_noop_outside_recording():
+    with stage("outside") as current:
+        current.rows_out = 5
+
+    assert current.rows_out is None
+
+
+def test_recording_captures_nested_stages_in_start_order():
+    data = _sample_data()
+
+    with recording() as recorder:
+        flotte_brand_opportunities(data, target_pct=0.5)
+
+    names = [record.name for record in recorder.records]
+    assert names == ["flotte_brand_opportunities", "brand_summary", "add_opportunity"]
+    assert [record.depth for record in recorder.records] == [0, 1, 1]
+    assert recorder.records[0].rows_in == 3
+    assert recorder.records[0].rows_out == 2
+    assert all(record.seconds >= 0 for record in recorder.records)
+    assert all(record.peak_mb is not None for record in recorder.records)
+
+
+def test_recording_disabled_yields_none_and_records_nothing():
+    @instrumented
+    def double(frame):
+        return pd.concat([frame, frame])
+
+    with recording(enabled=False) as recorder:
+        result = double(_sample_data())
+
+    assert recorder is None
+    assert len(result) == 6
+
+
+def test_recording_writes_json_log_lines(caplog):
+    with caplog.at_level(logging.INFO, logger="core.profiling"):
+        with recording(track_memory=False):
+            with stage("custom", rows_in=10) as current:
+                current.rows_out = 4
+
+    payload = json.loads(caplog.records[-1].getMessage())
+    assert payload["name"] == "custom"
+    assert payload["rows_in"] == 10
+    assert payload["rows_out"] == 4
+    assert payload["peak_mb"] is None
+    assert payload["seconds"] >= 0
+
+
+def test_app_debug_panel_emits_json_log_lines(caplog, tmp_path):
+    xlsx_path = tmp_path / "vendite.xlsx"
+    write_xlsx(generate_sales_export(200, seed=3), xlsx_path)
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.run()
+    try:
+        next(box for box in at.checkbox if box.label == "Pannello debug prestazioni").check().run()
+        at.file_uploader[0].upload("vendite.xlsx", xlsx_path.read_bytes()).run()
+    finally:
+        logger.setLevel(logging.NOTSET)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+    assert not at.exception
+    payloads = [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == "core.profiling"
+    ]
+    assert "read_sales_excel" in {payload["name"] for payload in payloads}
+    assert all(payload["peak_mb"] is None for payload in payloads)
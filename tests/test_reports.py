@@ -0,0 +1,103 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from core.metrics import segment_article_drilldown
+from core.reports import SHEET_NAME_MAX_LENGTH, iter_brand_drilldowns, write_margin_report
+
+
+def _sample_data():
+    return pd.DataFrame(
+        {
+            "categoria cliente": [46, 46, 46, 10, 10],
+            "marca": ["A", "A", "B/C", "A", "Marca con un nome davvero molto lungo"],
+            "articolo": ["x", "y", "z", "x", "w"],
+            "quantità": [10.0, 5.0, 1.0, 2.0, 4.0],
+            "fatturato_riga": [100.0, 50.0, 10.0, 20.0, 40.0],
+            "margine_euro": [30.0, 2.0, 5.0, 8.0, 1.0],
+            "costo_riga": [70.0, 48.0, 5.0, 12.0, 39.0],
+        }
+    )
+
+
+def test_iter_brand_drilldowns_matches_segment_article_drilldown():
+    df = _sample_data()
+
+    result = dict(iter_brand_drilldowns(df, "flotte", 0.4, ["A", "B/C", "missing"]))
+
+    assert list(result) == ["A", "B/C"]
+    expected = segment_article_drilldown(df, "flotte", "A", 0.4)
+    pd.testing.assert_frame_equal(
+        result["A"].reset_index(drop=True),
+        expected.reset_index(drop=True),
+    )
+
+
+def test_write_margin_report_creates_expected_sheets():
+    buffer = io.BytesIO()
+
+    write_margin_report(
+        _sample_data(),
+        buffer,
+        target_flotte_pct=0.5,
+        target_clienti_pct=0.45,
+        threshold_pct=0.10,
+    )
+
+    buffer.seek(0)
+    workbook = load_workbook(buffer, read_only=True)
+    titles = workbook.sheetnames
+
+    assert titles[:4] == ["KPI", "Flotte", "Clienti", "Sotto soglia"]
+    assert "F - A" in titles
+    assert "F - B_C" in titles
+    assert "C - A" in titles
+    assert all(len(title) <= SHEET_NAME_MAX_LENGTH for title in titles)
+
+    kpi_rows = list(workbook["KPI"].iter_rows(values_only=True))
+    assert kpi_rows[0] == ("segmento", "fatturato_totale", "margine_totale", "margine_medio_pct")
+    assert kpi_rows[3][0] == "totale"
+    assert kpi_rows[3][1] == pytest.approx(220.0)
+
+
+def test_write_margin_report_can_skip_drilldowns():
+    buffer = io.BytesIO()
+
+    write_margin_report(
+        _sample_data(),
+        buffer,
+        target_flotte_pct=0.5,
+        target_clienti_pct=0.45,
+        include_drilldowns=False,
+    )
+
+    buffer.seek(0)
+    assert load_workbook(buffer, read_only=True).sheetnames == [
+        "KPI",
+        "Flotte",
+        "Clienti",
+        "Sotto soglia",
+    ]
+
+
+def test_write_margin_report_low_margin_sheet_follows_segment():
+    buffer = io.BytesIO()
+
+    write_margin_report(
+        _sample_data(),
+        buffer,
+        target_flotte_pct=0.5,
+        target_clienti_pct=0.45,
+        threshold_pct=0.5,
+        segment="clienti",
+        include_drilldowns=False,
+    )
+
+    buffer.seek(0)
+    rows = list(load_workbook(buffer, read_only=True)["Sotto soglia"].iter_rows(values_only=True))
+    header, body = rows[0], rows[1:]
+    brands = {row[header.index("marca")] for row in body}
+    assert brands == {"A", "Marca con un nome davvero molto lungo"}
+    assert len(body) == 2